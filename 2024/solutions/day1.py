@@ -1,7 +1,12 @@
+from __future__ import annotations
+
+import random
 from collections import Counter
 from itertools import zip_longest
 from typing import cast
 
+from tools.lazy import np
+from tools.parsing import int_array, ints
 from tools.problem import Problem
 
 
@@ -9,7 +14,8 @@ class Day1(Problem):
     def __init__(self, load_example: bool = False):
         super().__init__(2024, 1, "Historian Hysteria", load_example)
         self.register_implementation(1, "Initial", self.part1_initial)
-        self.register_implementation(2, "Initial", self.part2_initial)
+        # Quadratic nested loop: runs for minutes on large inputs, so the sandbox stops it
+        self.register_implementation(2, "Initial", self.part2_initial, timeout=30)
         self.register_implementation(1, "Using sets", self.part1_sets)
         self.register_implementation(2, "Using Counter", self.part2_counter)
         self.register_implementation(
@@ -17,8 +23,22 @@ class Day1(Problem):
             "Using zip_longest",
             self.part1_zip_longest
         )
+        self.register_implementation(1, "NumPy", self.part1_numpy, parser=self.parse_arrays, data_mode="mmap")
+        self.register_implementation(2, "NumPy", self.part2_numpy, parser=self.parse_arrays, data_mode="mmap")
+        self.register_implementation(1, "Bulk ints", self.part1_bulk, parser=self.parse_ints, data_mode="mmap")
+        self.register_implementation(2, "Bulk ints", self.part2_bulk, parser=self.parse_ints, data_mode="mmap")
+
+    def generate_input(self, size: int, seed: int = 0) -> list[str]:
+        rng = random.Random(seed)
+        # Draw from a shared pool so part 2 finds repeated location ids
+        pool = [rng.randint(10_000, 99_999) for _ in range(max(size // 4, 1))]
+        lines = []
+        for _ in range(size):
+            left = rng.choice(pool) if rng.random() < 0.5 else rng.randint(10_000, 99_999)
+            lines.append(f"{left}   {rng.choice(pool)}")
+        return lines
 
-    def load_into_columns(self) -> tuple[list[int], list[int]]:
+    def parse(self) -> tuple[list[int], list[int]]:
         numbers: list[list[int]] = []
         for line in self.data:
             nums = [int(x) for x in line.split()]
@@ -33,20 +53,30 @@ class Day1(Problem):
 
         return col1, col2
 
+    def parse_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """Both columns as sorted ``int64`` arrays, tokenized straight from the input bytes."""
+        numbers = int_array(self.buffer, signed=False)
+        return np.sort(numbers[0::2]), np.sort(numbers[1::2])
+
+    def parse_ints(self) -> tuple[list[int], list[int]]:
+        """Both columns sorted, from a single regex pass over the input bytes instead of a split per line."""
+        numbers = ints(self.buffer, signed=False)
+        return sorted(numbers[0::2]), sorted(numbers[1::2])
+
     def part1_initial(self) -> int:
-        col1, col2 = self.load_into_columns()
-        total = sum(abs(a - b) for a, b in zip(col1, col2, strict=False))
+        col1, col2 = self.parsed
+        total: int = sum(abs(a - b) for a, b in zip(col1, col2, strict=False))
         return total
 
     def part1_sets(self) -> int:
-        col1, col2 = self.load_into_columns()
+        col1, col2 = self.parsed
         total = 0
         for i in range(len(col1)):
             total += abs(col1[i] - col2[i])
         return total
 
     def part1_zip_longest(self) -> int:
-        col1, col2 = self.load_into_columns()
+        col1, col2 = self.parsed
         total = 0
         for a, b in zip_longest(col1, col2):
             if a is None and b is not None:
@@ -59,7 +89,7 @@ class Day1(Problem):
         return total
 
     def part2_initial(self) -> int:
-        col1, col2 = self.load_into_columns()
+        col1, col2 = self.parsed
         similarity_array: list[int] = []
 
         for num in col1:
@@ -72,10 +102,32 @@ class Day1(Problem):
         return sum(similarity_array)
 
     def part2_counter(self) -> int:
-        col1, col2 = self.load_into_columns()
+        col1, col2 = self.parsed
+        counter2 = Counter(col2)
+        return sum(num * counter2[num] for num in col1)
+
+    def part1_bulk(self) -> int:
+        col1, col2 = self.parsed_with(self.parse_ints)
+        return sum(abs(a - b) for a, b in zip(col1, col2, strict=True))
+
+    def part2_bulk(self) -> int:
+        col1, col2 = self.parsed_with(self.parse_ints)
         counter2 = Counter(col2)
         return sum(num * counter2[num] for num in col1)
 
+    def part1_numpy(self) -> int:
+        col1, col2 = self.parsed_with(self.parse_arrays)
+        return int(np.abs(col1 - col2).sum())
+
+    def part2_numpy(self) -> int:
+        col1, col2 = self.parsed_with(self.parse_arrays)
+        values, counts = np.unique(col2, return_counts=True)
+        if not len(values):
+            return 0
+        positions = np.minimum(np.searchsorted(values, col1), len(values) - 1)
+        matches = np.where(values[positions] == col1, counts[positions], 0)
+        return int((col1 * matches).sum())
+
 
 if __name__ == "__main__":
     day1 = Day1(load_example=False)
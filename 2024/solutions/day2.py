@@ -1,3 +1,10 @@
+from __future__ import annotations
+
+import random
+
+from tools.lazy import np
+from tools.parallel import SharedArrays, parallel_map, sum_tuples
+from tools.parsing import padded, ragged_ints
 from tools.problem import Problem
 
 
@@ -30,6 +37,52 @@ def is_valid_sequence_alt(sequence: list) -> bool:
     )
 
 
+def _steps_ok(diffs: np.ndarray, direction: int) -> np.ndarray:
+    steps = diffs * direction
+    return (steps >= 1) & (steps <= 3)
+
+
+def batch_safety(levels: np.ndarray, lengths: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Which reports are safe as they are, and which are safe with at most one level removed.
+
+    ``levels`` holds one report per row, padded past ``lengths``. Removing level ``k`` leaves the steps before
+    ``k - 1``, the bridge ``levels[k + 1] - levels[k - 1]`` and the steps from ``k + 1`` on, so every removal is
+    checked at once from running ANDs of the step masks in both directions.
+    """
+    reports, width = levels.shape
+    if width == 0:
+        safe = np.ones(reports, dtype=bool)
+        return safe, safe
+
+    lengths = lengths[:, None]
+    k = np.arange(width)
+    diffs = np.diff(levels, axis=1)
+    bridges = levels[:, 2:] - levels[:, :-2]
+    diff_padding = k[:-1] >= lengths - 1
+    bridge_padding = k[1:-1] + 1 >= lengths
+    edge = np.ones((reports, 1), dtype=bool)
+
+    safe = np.zeros(reports, dtype=bool)
+    dampened = np.zeros(reports, dtype=bool)
+    for direction in (1, -1):
+        ok = _steps_ok(diffs, direction) | diff_padding
+        before = np.hstack([edge, np.logical_and.accumulate(ok, axis=1)])  # before[:, m]: steps 0..m-1 all ok
+        after = np.hstack([np.logical_and.accumulate(ok[:, ::-1], axis=1)[:, ::-1], edge, edge])  # m onwards
+        bridge_ok = np.hstack([edge, _steps_ok(bridges, direction) | bridge_padding, edge])[:, :width]
+
+        removable = before[:, np.maximum(k - 1, 0)] & bridge_ok & after[:, k + 1] & (k < lengths)
+        safe |= before[:, -1]
+        dampened |= removable.any(axis=1)
+
+    return safe, safe | dampened
+
+
+def count_safe(levels: np.ndarray, lengths: np.ndarray) -> tuple[int, int]:
+    """Safe and dampened-safe report counts of one chunk of rows, for ``parallel_map``."""
+    safe, dampened = batch_safety(levels, lengths)
+    return int(safe.sum()), int(dampened.sum())
+
+
 class Day2(Problem):
     def __init__(self, load_example: bool = False):
         super().__init__(2024, 2, "Red-Nosed Reports", load_example)
@@ -37,26 +90,58 @@ class Day2(Problem):
         self.register_implementation(1, "Original", self.part1_original)
         self.register_implementation(1, "List comprehension", self.part1_list_comp)
         self.register_implementation(1, "Using filter", self.part1_filter)
+        self.register_implementation(1, "Streaming lines", self.part1_streaming, data_mode="iter")
+        self.register_implementation(1, "NumPy batch", self.part1_batch, parser=self.parse_matrix, data_mode="mmap")
+        self.register_implementation(1, "NumPy batch, parallel", self.part1_parallel, parser=self.parse_shared,
+                                     data_mode="mmap")
 
         self.register_implementation(2, "Original", self.part2_original)
         self.register_implementation(2, "Using any", self.part2_using_any)
         self.register_implementation(2, "Slicing", self.part2_slicing)
-
-    def parse_input(self) -> list[list[int]]:
+        self.register_implementation(2, "Streaming lines", self.part2_streaming, data_mode="iter")
+        self.register_implementation(2, "NumPy batch", self.part2_batch, parser=self.parse_matrix, data_mode="mmap")
+        self.register_implementation(2, "NumPy batch, parallel", self.part2_parallel, parser=self.parse_shared,
+                                     data_mode="mmap")
+
+    def generate_input(self, size: int, seed: int = 0) -> list[str]:
+        rng = random.Random(seed)
+        lines = []
+        for _ in range(size):
+            direction = rng.choice((-1, 1))
+            levels = [rng.randint(25, 70)]
+            for _ in range(rng.randint(4, 7)):
+                levels.append(levels[-1] + direction * rng.randint(1, 3))
+            # Break roughly a third of the reports, some of them beyond what the dampener can fix
+            for _ in range(rng.choices((0, 1, 2), weights=(65, 25, 10))[0]):
+                levels[rng.randrange(len(levels))] += rng.choice((-5, -1, 0, 1, 4))
+            lines.append(" ".join(map(str, levels)))
+        return lines
+
+    def parse(self) -> list[list[int]]:
         return [[int(x) for x in line.strip().split()] for line in self.data]
 
+    def parse_matrix(self) -> tuple[np.ndarray, np.ndarray]:
+        """All reports as one zero-padded ``int16`` matrix, one row per line, plus the length of each report."""
+        return padded(*ragged_ints(self.buffer, signed=False), dtype=np.dtype(np.int16))
+
+    def parse_shared(self) -> SharedArrays:
+        return SharedArrays(*self.parsed_with(self.parse_matrix))
+
     def part1_original(self) -> int:
-        return sum(1 for sequence in self.parse_input() if is_valid_sequence(sequence))
+        return sum(1 for sequence in self.parsed if is_valid_sequence(sequence))
 
     def part1_list_comp(self) -> int:
-        return len([seq for seq in self.parse_input() if is_valid_sequence_alt(seq)])
+        return len([seq for seq in self.parsed if is_valid_sequence_alt(seq)])
 
     def part1_filter(self) -> int:
-        return len(list(filter(is_valid_sequence, self.parse_input())))
+        return len(list(filter(is_valid_sequence, self.parsed)))
+
+    def part1_streaming(self) -> int:
+        return sum(1 for line in self.iter_lines() if is_valid_sequence([int(x) for x in line.split()]))
 
     def part2_original(self) -> int:
         safe_count = 0
-        for sequence in self.parse_input():
+        for sequence in self.parsed:
             if is_valid_sequence(sequence):
                 safe_count += 1
                 continue
@@ -78,11 +163,11 @@ class Day2(Problem):
                 for i in range(len(seq))
             )
 
-        return sum(1 for seq in self.parse_input() if check_sequence(seq))
+        return sum(1 for seq in self.parsed if check_sequence(seq))
 
     def part2_slicing(self) -> int:
         safe_count = 0
-        for sequence in self.parse_input():
+        for sequence in self.parsed:
             if is_valid_sequence(sequence):
                 safe_count += 1
                 continue
@@ -96,6 +181,30 @@ class Day2(Problem):
 
         return safe_count
 
+    def part2_streaming(self) -> int:
+        safe_count = 0
+        for line in self.iter_lines():
+            sequence = [int(x) for x in line.split()]
+            if is_valid_sequence(sequence) or any(
+                is_valid_sequence(sequence[:i] + sequence[i + 1:]) for i in range(len(sequence))
+            ):
+                safe_count += 1
+        return safe_count
+
+    def part1_batch(self) -> int:
+        safe, _ = batch_safety(*self.parsed_with(self.parse_matrix))
+        return int(safe.sum())
+
+    def part2_batch(self) -> int:
+        _, dampened = batch_safety(*self.parsed_with(self.parse_matrix))
+        return int(dampened.sum())
+
+    def part1_parallel(self) -> int:
+        return int(parallel_map(count_safe, self.parsed_with(self.parse_shared), sum_tuples)[0])
+
+    def part2_parallel(self) -> int:
+        return int(parallel_map(count_safe, self.parsed_with(self.parse_shared), sum_tuples)[1])
+
 
 if __name__ == "__main__":
     day2 = Day2(load_example=False)
@@ -1,8 +1,69 @@
+import mmap
+import random
 import re
-from typing import Generator
+from dataclasses import dataclass
+from typing import Generator, Optional, Union
 
+from tools.parallel import available_cpus, shared_executor
 from tools.problem import Problem
 
+TOKEN = re.compile(rb"mul\((\d{1,3}),(\d{1,3})\)|do\(\)|don't\(\)")
+MAX_TOKEN_LENGTH = len(b"mul(999,999)")
+MIN_CHUNK_SIZE = 1 << 20  # Smaller chunks cost more to ship to a worker than to scan
+
+
+@dataclass
+class ChunkScan:
+    """What a chunk contributes, independently of the mul state it starts in."""
+    total: int = 0  # every mul, for part 1
+    leading: int = 0  # muls before the first do()/don't(), only counted if the chunk starts enabled
+    trailing: int = 0  # enabled muls after the first do()/don't()
+    state: Optional[bool] = None  # enabled at the end of the chunk, None if it has no do()/don't()
+
+
+def scan_chunk(buffer: Union[bytes, memoryview, mmap.mmap], start: int, end: int) -> ChunkScan:
+    """Scan the tokens that start in ``buffer[start:end]``, reading past ``end`` to finish the last one.
+
+    No token can contain another, so scanning from any offset finds the same tokens as a scan of the whole input.
+    """
+    scan = ChunkScan()
+    for match in TOKEN.finditer(buffer, start, min(end + MAX_TOKEN_LENGTH - 1, len(buffer))):
+        if match.start() >= end:
+            break
+        token = match[0]
+        if token == b"do()":
+            scan.state = True
+        elif token == b"don't()":
+            scan.state = False
+        else:
+            product = int(match[1]) * int(match[2])
+            scan.total += product
+            if scan.state is None:
+                scan.leading += product
+            elif scan.state:
+                scan.trailing += product
+    return scan
+
+
+def _scan_task(source: Union[str, bytes], start: int, end: int) -> ChunkScan:
+    """Pool entry point: ``source`` is the input file, mapped again in the worker, or the chunk's own bytes."""
+    if isinstance(source, bytes):
+        return scan_chunk(source, start, end)
+    with open(source, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return scan_chunk(mapped, start, end)
+
+
+def combine_scans(scans: list[ChunkScan]) -> tuple[int, int]:
+    """Fold the chunks in order, threading the mul state through them. Returns the part 1 and part 2 sums."""
+    total = enabled_total = 0
+    enabled = True
+    for scan in scans:
+        total += scan.total
+        enabled_total += (scan.leading if enabled else 0) + scan.trailing
+        if scan.state is not None:
+            enabled = scan.state
+    return total, enabled_total
+
 
 class Day3(Problem):
     def __init__(self, load_example: bool = False):
@@ -10,22 +71,59 @@ class Day3(Problem):
 
         self.register_implementation(1, "Regex with list comp", self.part1_regex_listcomp)
         self.register_implementation(1, "Regex with map", self.part1_regex_map)
+        self.register_implementation(1, "Bytes regex on mmap", self.part1_bytes_mmap, data_mode="mmap")
+        self.register_implementation(1, "Chunked scan", self.part1_chunked, data_mode="mmap")
+        self.register_implementation(1, "Chunked process pool", self.part1_chunked_pool, data_mode="mmap")
 
         self.register_implementation(2, "Regex state machine", self.part2_regex_state)
         self.register_implementation(2, "Iterator based", self.part2_iterator)
+        self.register_implementation(2, "Bytes regex on mmap", self.part2_bytes_mmap, data_mode="mmap")
+        self.register_implementation(2, "Chunked scan", self.part2_chunked, data_mode="mmap")
+        self.register_implementation(2, "Chunked process pool", self.part2_chunked_pool, data_mode="mmap")
+
+    def input_size(self) -> int:
+        return sum(len(line) for line in self.data)
+
+    def generate_input(self, size: int, seed: int = 0, line_length: int = 3000) -> list[str]:
+        rng = random.Random(seed)
+        noise = "?!@#$%^&*()[]{}<>:;'~-+/ ,"
+        decoys = ("what()", "how()", "from()", "select()", "who()", "where()", "mul(4*", "mul ( 2 , 4 )", "mul[3,7]")
+        lines: list[str] = []
+        total = 0
+        while total < size:
+            tokens: list[str] = []
+            length = 0
+            while length < min(line_length, size - total):
+                roll = rng.random()
+                if roll < 0.25:
+                    token = f"mul({rng.randint(1, 999)},{rng.randint(1, 999)})"
+                elif roll < 0.28:
+                    token = rng.choice(("do()", "don't()"))
+                elif roll < 0.45:
+                    token = rng.choice(decoys)
+                else:
+                    token = "".join(rng.choices(noise, k=rng.randint(1, 4)))
+                tokens.append(token)
+                length += len(token)
+            lines.append("".join(tokens))
+            total += length
+        return lines
+
+    def parse(self) -> str:
+        return "".join(self.data)
 
     def part1_regex_listcomp(self) -> int:
-        operations = re.findall(r"mul\(\d+,\d+\)", "".join(self.data))
+        operations = re.findall(r"mul\(\d+,\d+\)", self.parsed)
         return sum(int(x) * int(y) for op in operations for x, y in [op[4:-1].split(",")])
 
     def part1_regex_map(self) -> int:
-        operations = re.findall(r"mul\((\d+),(\d+)\)", "".join(self.data))
+        operations = re.findall(r"mul\((\d+),(\d+)\)", self.parsed)
         return sum(int(x) * int(y) for x, y in operations)
 
     def part2_regex_state(self) -> int:
         instructions = re.findall(
             r"mul\(\d{1,3},\d{1,3}\)|do\(\)|don't\(\)",
-            "".join(self.data)
+            self.parsed
         )
         mul_enabled = True
         results = []
@@ -55,7 +153,63 @@ class Day3(Problem):
                     x, y = map(int, instr[4:-1].split(","))
                     yield x * y
 
-        return sum(instruction_parser("".join(self.data)))
+        return sum(instruction_parser(self.parsed))
+
+    def part1_bytes_mmap(self) -> int:
+        return sum(
+            int(match[1]) * int(match[2])
+            for match in re.finditer(rb"mul\((\d{1,3}),(\d{1,3})\)", self.buffer)
+        )
+
+    def part2_bytes_mmap(self) -> int:
+        total = 0
+        mul_enabled = True
+        for match in re.finditer(rb"mul\((\d{1,3}),(\d{1,3})\)|do\(\)|don't\(\)", self.buffer):
+            token = match[0]
+            if token == b"do()":
+                mul_enabled = True
+            elif token == b"don't()":
+                mul_enabled = False
+            elif mul_enabled:
+                total += int(match[1]) * int(match[2])
+        return total
+
+    def scan_serial(self, chunk_size: int = 4096) -> tuple[int, int]:
+        """Chunked scan in this process. Small chunks by default, so the state stitching is exercised."""
+        buffer = self.buffer
+        return combine_scans([scan_chunk(buffer, start, start + chunk_size)
+                              for start in range(0, len(buffer), chunk_size)])
+
+    def scan_parallel(self, workers: Optional[int] = None) -> tuple[int, int]:
+        """Chunked scan spread over a process pool, one chunk per worker; small inputs are scanned in-process."""
+        workers = workers or available_cpus()
+        size = len(self.buffer)
+        chunk_size = max(MIN_CHUNK_SIZE, -(-size // workers))
+        if size <= chunk_size:
+            return combine_scans([scan_chunk(self.buffer, 0, size)])
+
+        offsets = range(0, size, chunk_size)
+        sources: list[Union[str, bytes]]
+        if self.data_path is not None:
+            sources = [self.data_path] * len(offsets)
+            starts, ends = list(offsets), [start + chunk_size for start in offsets]
+        else:
+            # Generated input: ship each worker its chunk plus the overlap it reads into
+            sources = [bytes(self.buffer[start:start + chunk_size + MAX_TOKEN_LENGTH - 1]) for start in offsets]
+            starts, ends = [0] * len(offsets), [chunk_size] * len(offsets)
+        return combine_scans(list(shared_executor(workers).map(_scan_task, sources, starts, ends)))
+
+    def part1_chunked(self) -> int:
+        return self.scan_serial()[0]
+
+    def part2_chunked(self) -> int:
+        return self.scan_serial()[1]
+
+    def part1_chunked_pool(self) -> int:
+        return self.scan_parallel()[0]
+
+    def part2_chunked_pool(self) -> int:
+        return self.scan_parallel()[1]
 
 
 if __name__ == "__main__":
@@ -1,16 +1,119 @@
-import re
+from __future__ import annotations
 
-import numpy as np
+import math
+import random
+import re
+from typing import Iterator
 
+from tools.grid import Grid, row_bands
+from tools.lazy import np
 from tools.problem import Problem
 
+# X-MAS crosses, "." matching any letter
+CROSSES = (("M.S", ".A.", "M.S"), ("S.M", ".A.", "S.M"), ("M.M", ".A.", "S.S"), ("S.S", ".A.", "M.M"))
+
+# Line directions as (row step, column step); each is searched forwards and backwards
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+def _shifted(mask: np.ndarray, step: int, direction: tuple[int, int], length: int = 4) -> np.ndarray:
+    """View of ``mask`` at letter ``step`` of every word of ``length`` letters laid out along ``direction``.
+
+    Empty when no word fits along ``direction``.
+    """
+    dr, dc = direction
+    height = mask.shape[0] - (length - 1) * dr
+    width = mask.shape[1] - (length - 1) * abs(dc)
+    if height <= 0 or width <= 0:
+        return mask[:0, :0]
+    row = step * dr
+    col = step * dc + (length - 1 if dc < 0 else 0)
+    return mask[row:row + height, col:col + width]
+
+
+def count_xmas(band: np.ndarray, anchors: int) -> int:
+    """XMAS and SAMX words starting in the first ``anchors`` rows of ``band``, the first letter being the topmost."""
+    x, m, a, s = (band == ord(letter) for letter in "XMAS")
+    matches = 0
+    for direction in DIRECTIONS:
+        if min(_shifted(x, 0, direction).shape) <= 0:
+            continue
+        # Forward and backward words differ in their first letter, so they never overlap
+        found = _shifted(x, 0, direction) & _shifted(m, 1, direction) & _shifted(a, 2, direction)
+        found &= _shifted(s, 3, direction)
+        backward = _shifted(s, 0, direction) & _shifted(a, 1, direction) & _shifted(m, 2, direction)
+        backward &= _shifted(x, 3, direction)
+        matches += int(np.count_nonzero(found[:anchors])) + int(np.count_nonzero(backward[:anchors]))
+    return matches
+
+
+def count_crosses(band: np.ndarray, anchors: int) -> int:
+    """X-MAS crosses whose top row is one of the first ``anchors`` rows of ``band``."""
+    if band.shape[0] < 3 or band.shape[1] < 3:
+        return 0
+    m, a, s = (band == ord(letter) for letter in "MAS")
+    top_left, top_right = np.s_[:-2, :-2], np.s_[:-2, 2:]
+    bottom_left, bottom_right = np.s_[2:, :-2], np.s_[2:, 2:]
+    diagonal = (m[top_left] & s[bottom_right]) | (s[top_left] & m[bottom_right])
+    anti_diagonal = (m[top_right] & s[bottom_left]) | (s[top_right] & m[bottom_left])
+    return int(np.count_nonzero((a[1:-1, 1:-1] & diagonal & anti_diagonal)[:anchors]))
+
 
 class Day4(Problem):
     def __init__(self, load_example: bool = False):
         super().__init__(2024, 4, "Ceres Search", load_example)
         self.register_implementation(1, "Original", self.part1_original)
         self.register_implementation(1, "Kernel", self.part1_kernel)
+        self.register_implementation(1, "Strided windows", self.part1_strided, parser=self.grid_view,
+                                     data_mode="mmap")
+        self.register_implementation(1, "Shifted masks", self.part1_shifted, parser=self.grid_view,
+                                     data_mode="mmap")
+        self.register_implementation(1, "Grid", self.part1_grid, parser=self.parse_grid, data_mode="mmap")
         self.register_implementation(2, "Original", self.part2_original)
+        self.register_implementation(2, "Grid", self.part2_grid, parser=self.parse_grid, data_mode="mmap")
+        self.register_implementation(2, "Shifted masks", self.part2_shifted, parser=self.grid_view,
+                                     data_mode="mmap")
+        # Bands of rows overlapping by the 3 extra rows a word can span, so memory does not grow with the grid
+        self.register_implementation(1, "Row bands, mmap", self.part1_bands_mmap, data_mode="mmap")
+        self.register_implementation(1, "Row bands, file", self.part1_bands_file, data_mode="mmap")
+        self.register_implementation(2, "Row bands, mmap", self.part2_bands_mmap, data_mode="mmap")
+        self.register_implementation(2, "Row bands, file", self.part2_bands_file, data_mode="mmap")
+
+    def input_size(self) -> int:
+        return len(self.data) * len(self.data[0]) if self.data else 0
+
+    def generate_input(self, size: int, seed: int = 0) -> list[str]:
+        rng = random.Random(seed)
+        side = max(math.isqrt(size), 4)
+        return ["".join(rng.choices("XMAS", k=side)) for _ in range(side)]
+
+    def grid_view(self) -> np.ndarray:
+        """The input as a ``uint8`` matrix viewing the mapped file directly, skipping the newline column."""
+        view = self.buffer
+        if not view:
+            raise ValueError("Empty grid provided")
+
+        probe = 256
+        width = view[:probe].tobytes().find(b"\n")
+        while width < 0 and probe < len(view):
+            probe *= 4
+            width = view[:probe].tobytes().find(b"\n")
+        width = len(view) if width < 0 else width
+
+        flat = np.frombuffer(view, dtype=np.uint8)
+        rows = (len(flat) + 1) // (width + 1)
+        return np.lib.stride_tricks.as_strided(flat, shape=(rows, width), strides=(width + 1, 1), writeable=False)
+
+    def parse_grid(self) -> Grid:
+        return Grid.from_bytes(self.buffer)
+
+    def _file_bands(self) -> Iterator[tuple[np.ndarray, int]]:
+        """Bands read straight from the data file; generated inputs only exist in memory, so they use the buffer."""
+        if self.data_path is None:
+            yield from row_bands(self.buffer, overlap=3)
+            return
+        with open(self.data_path, "rb") as file:
+            yield from row_bands(file, overlap=3)
 
     def part1_original(self) -> int:
         if not self.data:
@@ -90,6 +193,83 @@ class Day4(Problem):
 
         return sum(apply_kernel(kernel) for kernel in kernels.values())
 
+    def part1_strided(self) -> int:
+        grid = self.parsed_with(self.grid_view)
+        rows, cols = grid.shape
+        row_stride, col_stride = grid.strides
+        forward = np.frombuffer(b"XMAS", dtype=np.uint8)
+        backward = forward[::-1]
+
+        def count(windows: np.ndarray) -> int:
+            return int((windows == forward).all(axis=-1).sum() + (windows == backward).all(axis=-1).sum())
+
+        strided = np.lib.stride_tricks.as_strided
+        windows = []
+        if cols >= 4:
+            windows.append(np.lib.stride_tricks.sliding_window_view(grid, 4, axis=1))
+        if rows >= 4:
+            windows.append(np.lib.stride_tricks.sliding_window_view(grid, 4, axis=0))
+        if rows >= 4 and cols >= 4:
+            shape = (rows - 3, cols - 3, 4)
+            windows.append(strided(grid, shape, (row_stride, col_stride, row_stride + col_stride), writeable=False))
+            windows.append(strided(grid[:, 3:], shape, (row_stride, col_stride, row_stride - col_stride),
+                                   writeable=False))
+        return sum(count(window) for window in windows)
+
+    def part1_shifted(self) -> int:
+        grid = self.parsed_with(self.grid_view)
+        with self.phase("masks"):
+            x, m, a, s = (grid == ord(letter) for letter in "XMAS")
+        # Scratch masks reused across directions, so the ANDs below run in place instead of allocating
+        forward, backward = np.empty_like(x), np.empty_like(x)
+        matches = 0
+        with self.phase("scan"):
+            for direction in DIRECTIONS:
+                shape = _shifted(x, 0, direction).shape
+                if min(shape) <= 0:
+                    continue
+                fwd, bwd = forward[:shape[0], :shape[1]], backward[:shape[0], :shape[1]]
+                np.logical_and(_shifted(m, 1, direction), _shifted(a, 2, direction), out=fwd)
+                np.logical_and(fwd, _shifted(x, 0, direction), out=fwd)
+                np.logical_and(fwd, _shifted(s, 3, direction), out=fwd)
+                np.logical_and(_shifted(a, 1, direction), _shifted(m, 2, direction), out=bwd)
+                np.logical_and(bwd, _shifted(s, 0, direction), out=bwd)
+                np.logical_and(bwd, _shifted(x, 3, direction), out=bwd)
+                matches += int(np.count_nonzero(fwd)) + int(np.count_nonzero(bwd))
+        return matches
+
+    def part2_shifted(self) -> int:
+        grid = self.parsed_with(self.grid_view)
+        if grid.shape[0] < 3 or grid.shape[1] < 3:
+            raise ValueError("Grid smaller than kernel pattern")
+        with self.phase("masks"):
+            m, a, s = (grid == ord(letter) for letter in "MAS")
+        top_left, top_right = np.s_[:-2, :-2], np.s_[:-2, 2:]
+        bottom_left, bottom_right = np.s_[2:, :-2], np.s_[2:, 2:]
+        with self.phase("scan"):
+            diagonal = (m[top_left] & s[bottom_right]) | (s[top_left] & m[bottom_right])
+            anti_diagonal = (m[top_right] & s[bottom_left]) | (s[top_right] & m[bottom_left])
+            return int(np.count_nonzero(a[1:-1, 1:-1] & diagonal & anti_diagonal))
+
+    def part1_bands_mmap(self) -> int:
+        return sum(count_xmas(band, anchors) for band, anchors in row_bands(self.buffer, overlap=3))
+
+    def part1_bands_file(self) -> int:
+        return sum(count_xmas(band, anchors) for band, anchors in self._file_bands())
+
+    def part2_bands_mmap(self) -> int:
+        return sum(count_crosses(band, anchors) for band, anchors in row_bands(self.buffer, overlap=3))
+
+    def part2_bands_file(self) -> int:
+        return sum(count_crosses(band, anchors) for band, anchors in self._file_bands())
+
+    def part1_grid(self) -> int:
+        return self.parsed_with(self.parse_grid).count_word("XMAS")
+
+    def part2_grid(self) -> int:
+        grid = self.parsed_with(self.parse_grid)
+        return sum(grid.count(cross) for cross in CROSSES)
+
     def part2_original(self) -> int:
         kernels = [
             [
@@ -1,8 +1,16 @@
+from __future__ import annotations
+
+import copy
+import random
 from abc import ABC, abstractmethod
 from collections import defaultdict, deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set, Tuple, cast
 
+from tools.graph import CSRGraph
+from tools.lazy import np
+from tools.parallel import SharedArrays, parallel_map, sum_tuples
+from tools.parsing import int_array, intern, padded, ragged_ints, sections
 from tools.problem import Problem
 
 
@@ -32,7 +40,8 @@ class Graph:
     def get_topology(self) -> List[str]:
         result = []
         visited = set()
-        queue = deque([v for v in self.vertices if self.in_degree[v] == 0])
+        in_degree = dict(self.in_degree)  # Work on a copy so the graph can be sorted again
+        queue = deque([v for v in self.vertices if in_degree.get(v, 0) == 0])
 
         while queue:
             current = queue.popleft()
@@ -41,8 +50,8 @@ class Graph:
                 visited.add(current)
 
                 for neighbor in self.edges[current]:
-                    self.in_degree[neighbor] -= 1
-                    if self.in_degree[neighbor] == 0:
+                    in_degree[neighbor] -= 1
+                    if in_degree[neighbor] == 0:
                         queue.append(neighbor)
 
         return result if len(result) == len(self.vertices) else []
@@ -117,14 +126,239 @@ class PageSequence(Sequence):
         return int(self.pages[len(self.pages) // 2])
 
 
+@dataclass
+class TrackedUpdate:
+    """An update plus the counts that let a new rule be applied to it in constant time."""
+    sequence: PageSequence
+    positions: Dict[str, int]
+    missing: int  # consecutive pairs that no rule allows yet, valid at 0
+    predecessors: Optional[Dict[str, int]] = None  # pages of the update that a rule puts before each page
+    part: int = 1
+    middle: int = 0
+
+
+class IncrementalQueue:
+    """Print queue fed rules and updates in any order, keeping both part totals up to date.
+
+    A new update only costs its own check. A new rule only touches the updates that contain both of its pages, and
+    for each of them just adjusts two counters before reading off the new status and middle page.
+    """
+
+    def __init__(self) -> None:
+        self.ruleset = RuleSet()
+        self.updates: List[TrackedUpdate] = []
+        self._pairs: Set[Tuple[str, str]] = set()
+        self._containing: Dict[str, Set[int]] = defaultdict(set)
+        self._totals = {1: 0, 2: 0}
+
+    def feed(self, line: str) -> None:
+        if '|' in line:
+            self.add_rule(Rule.from_string(line))
+        elif ',' in line:
+            self.add_sequence(PageSequence(line))
+
+    def add_rule(self, rule: Rule) -> None:
+        if (rule.prev, rule.next) in self._pairs:
+            return
+        self._pairs.add((rule.prev, rule.next))
+        self.ruleset.add_rule(rule)
+        if rule.prev not in self._containing or rule.next not in self._containing:
+            return
+        for index in self._containing[rule.prev] & self._containing[rule.next]:
+            update = self.updates[index]
+            if update.positions[rule.prev] + 1 == update.positions[rule.next]:
+                update.missing -= 1
+            if update.predecessors is not None:
+                update.predecessors[rule.next] += 1
+            self._settle(update)
+
+    def add_sequence(self, sequence: PageSequence) -> None:
+        pages = sequence.pages
+        for page in pages:
+            self._containing[page].add(len(self.updates))
+        update = TrackedUpdate(
+            sequence,
+            {page: i for i, page in enumerate(pages)},
+            sum((prev, next_page) not in self._pairs for prev, next_page in zip(pages, pages[1:])),
+        )
+        self.updates.append(update)
+        self._settle(update)
+
+    def totals(self) -> Dict[int, int]:
+        return dict(self._totals)
+
+    def _settle(self, update: TrackedUpdate) -> None:
+        """Move the update's middle page to the total of the part it now belongs to."""
+        self._totals[update.part] -= update.middle
+        if update.missing == 0:
+            update.part, update.middle = 1, update.sequence.get_middle_value()
+        else:
+            # Middle page once ordered: the one with half of the other pages before it. Counted on first need,
+            # as rules only ever add up and an update that is valid stays valid
+            pages = update.sequence.pages
+            if update.predecessors is None:
+                update.predecessors = {page: sum((other, page) in self._pairs for other in pages) for page in pages}
+            target = len(pages) // 2
+            ordered_middle = next((page for page, count in update.predecessors.items() if count == target),
+                                  pages[target])  # The rules do not order these pages yet
+            update.part, update.middle = 2, int(ordered_middle)
+        self._totals[update.part] += update.middle
+
+
+@dataclass
+class PrecedenceIndex:
+    """Pages interned as dense integer ids, with the rules as a boolean matrix.
+
+    ``before[a, b]`` is true when a rule puts page ``a`` before page ``b``. Updates are rows of ``updates``,
+    padded past ``lengths`` with an extra id whose row and column are all false.
+    """
+    values: np.ndarray  # page number of each id
+    before: np.ndarray
+    updates: np.ndarray
+    lengths: np.ndarray
+
+    BLOCK = 4096  # Updates per block when counting predecessors, bounds the (block, length, length) temporary
+
+    @classmethod
+    def from_lines(cls, lines: List[str]) -> PrecedenceIndex:
+        ids: Dict[str, int] = {}
+        rules: List[Tuple[int, int]] = []
+        rows: List[List[int]] = []
+        for line in lines:
+            if '|' in line:
+                prev, next_page = line.split('|')
+                rules.append((ids.setdefault(prev, len(ids)), ids.setdefault(next_page, len(ids))))
+            elif ',' in line:
+                rows.append([ids.setdefault(page, len(ids)) for page in line.split(',')])
+
+        padding = len(ids)
+        before = np.zeros((padding + 1, padding + 1), dtype=bool)
+        if rules:
+            prev_ids, next_ids = zip(*rules)
+            before[list(prev_ids), list(next_ids)] = True
+
+        lengths = np.array([len(row) for row in rows], dtype=np.int64)
+        updates = np.full((len(rows), lengths.max(initial=0)), padding, dtype=np.int64)
+        for i, row in enumerate(rows):
+            updates[i, :len(row)] = row
+        values = np.array([int(page) for page in ids] + [0], dtype=np.int64)
+        return cls(values, before, updates, lengths)
+
+    @classmethod
+    def from_buffer(cls, buffer: memoryview) -> PrecedenceIndex:
+        """Same index parsed with whole-array operations, interning the page numbers in bulk."""
+        rules_section, updates_section = sections(buffer)[:2]
+        rules = int_array(rules_section, signed=False)
+        offsets, pages = ragged_ints(updates_section, signed=False)
+
+        values, ids = intern(np.concatenate([rules, pages]))
+        padding = len(values)
+        before = np.zeros((padding + 1, padding + 1), dtype=bool)
+        before[ids[:len(rules):2], ids[1:len(rules):2]] = True
+        updates, lengths = padded(offsets, ids[len(rules):], fill=padding)
+        return cls(np.append(values, 0), before, updates, lengths)
+
+    def valid_mask(self) -> np.ndarray:
+        """Updates whose consecutive pages all follow a rule, checked for every update at once."""
+        in_order = self.before[self.updates[:, :-1], self.updates[:, 1:]]
+        padded = np.arange(self.updates.shape[1] - 1) >= self.lengths[:, None] - 1
+        return np.asarray((in_order | padded).all(axis=1))
+
+    def ordered_middles(self, selected: np.ndarray) -> np.ndarray:
+        """Middle page of each selected update once ordered: the page with ``length // 2`` predecessors in it."""
+        updates, lengths = self.updates[selected], self.lengths[selected]
+        middles = np.empty(len(updates), dtype=np.int64)
+        for start in range(0, len(updates), self.BLOCK):
+            block = updates[start:start + self.BLOCK]
+            # predecessors[u, i]: pages of update u that a rule puts before its i-th page
+            predecessors = self.before[block[:, None, :], block[:, :, None]].sum(axis=2)
+            target = lengths[start:start + self.BLOCK, None] // 2
+            is_middle = (predecessors == target) & (block != len(self.values) - 1)
+            middles[start:start + self.BLOCK] = block[np.arange(len(block)), is_middle.argmax(axis=1)]
+        return np.asarray(self.values[middles])
+
+
+def middle_sums(updates: np.ndarray, lengths: np.ndarray, before: np.ndarray, values: np.ndarray) -> Tuple[int, int]:
+    """Middle page sums of the valid updates and of the reordered invalid ones, for a chunk of ``parallel_map``."""
+    index = PrecedenceIndex(values, before, updates, lengths)
+    valid = index.valid_mask()
+    valid_middles = index.values[index.updates[valid, index.lengths[valid] // 2]]
+    return int(valid_middles.sum()), int(index.ordered_middles(~valid).sum())
+
+
 class Day5(Problem):
     def __init__(self, load_example: bool = False):
         super().__init__(2024, 5, "Print Queue", load_example)
-        self._ruleset: RuleSet = self._create_ruleset()
-        self._sequences: List[PageSequence] = self._create_sequences()
 
         self.register_implementation(1, "Original", self.part1_original)
         self.register_implementation(2, "Original", self.part2_original)
+        self.register_implementation(1, "Precedence matrix", self.part1_matrix, parser=self.parse_index)
+        self.register_implementation(2, "Precedence matrix", self.part2_matrix, parser=self.parse_index)
+        self.register_implementation(1, "Precedence matrix, bulk parse", self.part1_matrix_bulk,
+                                     parser=self.parse_index_bulk, data_mode="mmap")
+        self.register_implementation(2, "Precedence matrix, bulk parse", self.part2_matrix_bulk,
+                                     parser=self.parse_index_bulk, data_mode="mmap")
+        self.register_implementation(1, "Precedence matrix, parallel", self.part1_parallel,
+                                     parser=self.parse_shared, data_mode="mmap")
+        self.register_implementation(2, "Precedence matrix, parallel", self.part2_parallel,
+                                     parser=self.parse_shared, data_mode="mmap")
+        self.register_implementation(1, "CSR graph", self.part1_graph, parser=self.parse_graph)
+        self.register_implementation(2, "CSR graph", self.part2_graph, parser=self.parse_graph)
+        self.register_implementation(1, "Incremental", self.part1_incremental)
+        self.register_implementation(2, "Incremental", self.part2_incremental)
+
+    def input_size(self) -> int:
+        return sum(1 for line in self.data if ',' in line)
+
+    def generate_input(self, size: int, seed: int = 0, page_count: int = 49) -> List[str]:
+        rng = random.Random(seed)
+        order = rng.sample(range(10, 100), page_count)
+        rank = {page: i for i, page in enumerate(order)}
+        # Like the real input, every pair of pages has a rule
+        rules = [f"{a}|{b}" for i, a in enumerate(order) for b in order[i + 1:]]
+        rng.shuffle(rules)
+
+        updates = []
+        for _ in range(size):
+            pages = rng.sample(order, rng.randrange(5, 24, 2))
+            if rng.random() < 0.5:
+                pages.sort(key=rank.__getitem__)
+            else:
+                rng.shuffle(pages)
+            updates.append(",".join(map(str, pages)))
+        return rules + [""] + updates
+
+    def stream_engine(self) -> IncrementalQueue:
+        return IncrementalQueue()
+
+    def parse(self) -> Tuple[RuleSet, List[PageSequence]]:
+        return self._create_ruleset(), self._create_sequences()
+
+    @property
+    def _ruleset(self) -> RuleSet:
+        return cast(RuleSet, self.parsed[0])
+
+    @property
+    def _sequences(self) -> List[PageSequence]:
+        return cast(List[PageSequence], self.parsed[1])
+
+    def parse_index(self) -> PrecedenceIndex:
+        return PrecedenceIndex.from_lines(self.data)
+
+    def parse_index_bulk(self) -> PrecedenceIndex:
+        return PrecedenceIndex.from_buffer(self.buffer)
+
+    def parse_shared(self) -> SharedArrays:
+        index = self.parsed_with(self.parse_index_bulk)
+        return SharedArrays(index.updates, index.lengths, index.before, index.values)
+
+    def parse_graph(self) -> Tuple[CSRGraph[int], List[List[int]]]:
+        """The rules as a graph over interned page numbers, and the updates as vertex ids."""
+        rules = [tuple(map(int, line.split('|'))) for line in self.data if '|' in line]
+        updates = [list(map(int, line.split(','))) for line in self.data if ',' in line]
+        graph: CSRGraph[int] = CSRGraph.from_edges(((prev, next_page) for prev, next_page in rules),
+                                                   vertices=(page for update in updates for page in update))
+        return graph, [[graph.vertex(page) for page in update] for update in updates]
 
     def _create_ruleset(self) -> RuleSet:
         rules = [Rule.from_string(line) for line in self.data if line and '|' in line]
@@ -141,16 +375,78 @@ class Day5(Problem):
         )
 
     def part2_original(self) -> int:
-        invalid_sequences = [
-            seq for seq in self._sequences
-            if not seq.is_valid(self._ruleset)
-        ]
+        with self.phase("validate"):
+            # Reordered on copies, so every call sorts the parsed updates afresh rather than already sorted ones
+            invalid_sequences = [
+                copy.copy(seq) for seq in self._sequences
+                if not seq.is_valid(self._ruleset)
+            ]
 
-        for seq in invalid_sequences:
-            seq.get_valid_ordering(self._ruleset)
+        with self.phase("reorder"):
+            for seq in invalid_sequences:
+                seq.get_valid_ordering(self._ruleset)
 
         return sum(seq.get_middle_value() for seq in invalid_sequences)
 
+    @staticmethod
+    def _valid_middles(index: PrecedenceIndex) -> int:
+        valid = index.valid_mask()
+        middles = index.updates[valid, index.lengths[valid] // 2]
+        return int(index.values[middles].sum())
+
+    def part1_matrix(self) -> int:
+        return self._valid_middles(self.parsed_with(self.parse_index))
+
+    def part2_matrix(self) -> int:
+        index = self.parsed_with(self.parse_index)
+        with self.phase("validate"):
+            invalid = ~index.valid_mask()
+        with self.phase("reorder"):
+            return int(index.ordered_middles(invalid).sum())
+
+    def part1_matrix_bulk(self) -> int:
+        return self._valid_middles(self.parsed_with(self.parse_index_bulk))
+
+    def part2_matrix_bulk(self) -> int:
+        index = self.parsed_with(self.parse_index_bulk)
+        return int(index.ordered_middles(~index.valid_mask()).sum())
+
+    def part1_parallel(self) -> int:
+        return int(parallel_map(middle_sums, self.parsed_with(self.parse_shared), sum_tuples, split=(0, 1))[0])
+
+    def part2_parallel(self) -> int:
+        return int(parallel_map(middle_sums, self.parsed_with(self.parse_shared), sum_tuples, split=(0, 1))[1])
+
+    def part1_graph(self) -> int:
+        graph, updates = self.parsed_with(self.parse_graph)
+        return sum(
+            graph.label(update[len(update) // 2])
+            for update in updates
+            if all(graph.has_edge(prev, next_page) for prev, next_page in zip(update, update[1:]))
+        )
+
+    def part2_graph(self) -> int:
+        graph, updates = self.parsed_with(self.parse_graph)
+        total = 0
+        for update in updates:
+            if not all(graph.has_edge(prev, next_page) for prev, next_page in zip(update, update[1:])):
+                subgraph = graph.subgraph(update)
+                order = subgraph.topological_sort()
+                total += graph.label(subgraph.label(order[len(order) // 2]))
+        return total
+
+    def _feed_all(self) -> IncrementalQueue:
+        queue = IncrementalQueue()
+        for line in self.data:
+            queue.feed(line)
+        return queue
+
+    def part1_incremental(self) -> int:
+        return self._feed_all().totals()[1]
+
+    def part2_incremental(self) -> int:
+        return self._feed_all().totals()[2]
+
 
 if __name__ == "__main__":
     problem = Day5(load_example=False)
@@ -6,6 +6,8 @@ class Day1(Problem):
         super().__init__(2024, 1, "Day 1", load_example)
         self.register_implementation(1, "Original", self.part1_original)
 
+    def parse(self) -> list[str]:
+        return self.data
 
     def part1_original(self) -> int:
         return 0
@@ -0,0 +1,202 @@
+import argparse
+import contextlib
+import csv
+import hashlib
+import os
+import pickle
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TOOLS_DIR = PROJECT_ROOT / "tools"
+CACHE_DIR = ".cache"  # inside each year's directory
+ENTRY_SUFFIX = ".pickle"
+
+MISSING = object()
+
+# In-process copies of the solutions tables, keyed by path and validated against the file's (size, mtime)
+_solutions: Dict[str, Tuple[Tuple[int, int], Dict[int, Dict[str, str]]]] = {}
+
+
+@dataclass(frozen=True)
+class CacheConfig:
+    enabled: bool = False
+    directory: Optional[str] = None  # default: <year>/.cache
+    max_bytes: int = 256 * 2 ** 20  # least recently used entries are evicted past this
+
+
+def _stamp(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def content_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _source_hash(path: str, stamp: Tuple[int, int]) -> str:
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def code_fingerprint(func: Callable[..., Any]) -> str:
+    """Hash of the source of the module defining ``func`` and of every ``tools`` module on disk.
+
+    Coarse on purpose: any edit to a solution file or to the shared tooling invalidates the entries built with it.
+    The set of files is fixed, so the key does not depend on what else the run happened to import.
+    """
+    files = [getattr(sys.modules.get(func.__module__), "__file__", None)]
+    files.extend(sorted(str(path) for path in TOOLS_DIR.glob("*.py")))
+    digest = hashlib.sha256()
+    for path in files:
+        if path:
+            digest.update(_source_hash(path, _stamp(path)).encode())
+    return digest.hexdigest()[:16]
+
+
+class ParseCache:
+    """Pickled values derived from an input file, stored one file per entry.
+
+    Each entry records the size, mtime and content hash of the input it was built from. A matching size and
+    mtime is trusted as is; otherwise the content hash decides, so a touched but unchanged input stays valid.
+    Entries are read back with a single ``read_bytes``, and every hit refreshes the entry's mtime, which is what
+    eviction orders on once the directory grows past ``max_bytes``. Writes go through a temporary file and
+    ``os.replace``, so parallel workers sharing a directory never see partial entries.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def for_year(cls, year: int, config: CacheConfig) -> "ParseCache":
+        directory = Path(config.directory) if config.directory else PROJECT_ROOT / str(year) / CACHE_DIR
+        return cls(directory, config.max_bytes)
+
+    def _entry(self, key: str) -> Path:
+        return self.directory / f"{key}{ENTRY_SUFFIX}"
+
+    def get(self, key: str, path: str) -> Any:
+        """The value stored under ``key`` if it was built from the current contents of ``path``, else ``MISSING``."""
+        entry = self._entry(key)
+        try:
+            meta, value = pickle.loads(entry.read_bytes())
+            stamp = _stamp(path)
+        except FileNotFoundError:
+            return MISSING
+        except Exception:
+            # Truncated or written by an incompatible version of the code
+            entry.unlink(missing_ok=True)
+            return MISSING
+
+        if tuple(meta["stamp"]) != stamp:
+            if meta["size"] != stamp[0] or meta["hash"] != content_hash(path):
+                entry.unlink(missing_ok=True)
+                return MISSING
+            self._write(entry, {**meta, "stamp": stamp}, value)
+        else:
+            with contextlib.suppress(FileNotFoundError):
+                os.utime(entry)
+        return value
+
+    def put(self, key: str, path: str, value: Any) -> bool:
+        """Store ``value`` for the current contents of ``path``; ``False`` if it cannot be pickled."""
+        stamp = _stamp(path)
+        meta = {"path": path, "size": stamp[0], "stamp": stamp, "hash": content_hash(path)}
+        try:
+            self._write(self._entry(key), meta, value)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return False
+        self.evict()
+        return True
+
+    def fetch(self, key: str, path: str, produce: Callable[[], T]) -> T:
+        value = self.get(key, path)
+        if value is MISSING:
+            value = produce()
+            self.put(key, path, value)
+        return value  # type: ignore[no-any-return]
+
+    def _write(self, entry: Path, meta: Dict[str, Any], value: Any) -> None:
+        payload = pickle.dumps((meta, value), protocol=pickle.HIGHEST_PROTOCOL)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temporary = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+        temporary.write_bytes(payload)
+        os.replace(temporary, entry)
+
+    def entries(self) -> List[Tuple[Path, os.stat_result]]:
+        """Entries from most to least recently used."""
+        found = []
+        for entry in self.directory.glob(f"*{ENTRY_SUFFIX}"):
+            try:
+                found.append((entry, entry.stat()))
+            except FileNotFoundError:
+                continue  # evicted by another process meanwhile
+        return sorted(found, key=lambda item: item[1].st_mtime_ns, reverse=True)
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the directory fits ``max_bytes``; returns how many went."""
+        total, removed = 0, 0
+        for entry, stat in self.entries():
+            total += stat.st_size
+            if total > self.max_bytes:
+                entry.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def clear(self) -> int:
+        entries = self.entries()
+        for entry, _ in entries:
+            entry.unlink(missing_ok=True)
+        return len(entries)
+
+
+def _read_solutions(path: str) -> Dict[int, Dict[str, str]]:
+    with open(path, mode='r') as file:
+        return {int(row["day"]): row for row in csv.DictReader(file)}
+
+
+def solutions_table(path: str, cache: Optional[ParseCache] = None) -> Dict[int, Dict[str, str]]:
+    """The rows of a ``solutions.csv`` indexed by day.
+
+    Kept in memory per process and, with a ``cache``, on disk, so each problem does a dictionary lookup instead of
+    re-reading the file.
+    """
+    stamp = _stamp(path)
+    memo = _solutions.get(path)
+    if memo is not None and memo[0] == stamp:
+        return memo[1]
+    table = cache.fetch("solutions", path, lambda: _read_solutions(path)) if cache else _read_solutions(path)
+    _solutions[path] = (stamp, table)
+    return table
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Inspect or clear the cache of parsed inputs")
+    parser.add_argument("command", choices=("info", "clear"))
+    parser.add_argument("year", type=int, nargs="?", default=2024)
+    parser.add_argument("--directory", help="Cache directory (default: <year>/.cache)")
+    args = parser.parse_args(argv)
+
+    cache = ParseCache.for_year(args.year, CacheConfig(directory=args.directory))
+    if args.command == "clear":
+        print(f"Removed {cache.clear()} entries from {cache.directory}")
+        return
+    entries = cache.entries()
+    print(f"{cache.directory}: {len(entries)} entries, {sum(stat.st_size for _, stat in entries) / 2 ** 20:.2f} MiB")
+    for entry, stat in entries:
+        print(f"  {stat.st_size / 1000:>10.1f} KB  {entry.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import heapq
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Callable, Dict, Generic, Hashable, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+H = TypeVar("H", bound=Hashable)
+
+INFINITY = float("inf")
+
+
+class CycleError(ValueError):
+    def __init__(self, cycle: List[int]) -> None:
+        super().__init__(f"Graph has a cycle through {len(cycle)} vertices")
+        self.cycle = cycle  # vertex ids, each with an edge to the next and the last back to the first
+
+
+class Interner(Generic[H]):
+    """Dense integer ids for hashable labels, in order of first appearance."""
+
+    def __init__(self, labels: Iterable[H] = ()) -> None:
+        self.ids: Dict[H, int] = {}
+        self.labels: List[H] = []
+        for label in labels:
+            self.add(label)
+
+    def add(self, label: H) -> int:
+        vertex = self.ids.get(label)
+        if vertex is None:
+            vertex = self.ids[label] = len(self.labels)
+            self.labels.append(label)
+        return vertex
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+
+class CSRGraph(Generic[H]):
+    """Immutable directed graph over vertices ``0..n-1`` in compressed sparse row layout.
+
+    The targets of vertex ``v`` are ``targets[offsets[v]:offsets[v + 1]]``, sorted so edge lookups are a binary
+    search. Everything lives in a few flat ``array`` buffers, and no algorithm modifies the graph, so one graph
+    serves any number of queries.
+    """
+
+    def __init__(self, offsets: array, targets: array, weights: Optional[array] = None,
+                 interner: Optional[Interner[H]] = None) -> None:
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.interner = interner
+
+    @classmethod
+    def from_edges(cls, edges: Iterable[Tuple[H, H]], weights: Optional[Iterable[float]] = None,
+                   vertices: Iterable[H] = (), undirected: bool = False) -> "CSRGraph[H]":
+        """Build a graph from labelled edges, interning the labels. ``vertices`` adds isolated ones."""
+        interner: Interner[H] = Interner(vertices)
+        pairs = [(interner.add(source), interner.add(target)) for source, target in edges]
+        costs = list(weights) if weights is not None else None
+        if undirected:
+            pairs += [(target, source) for source, target in pairs]
+            if costs is not None:
+                costs += costs
+        return cls.from_ids(len(interner), pairs, costs, interner)
+
+    @classmethod
+    def from_ids(cls, vertex_count: int, pairs: Sequence[Tuple[int, int]], costs: Optional[Sequence[float]] = None,
+                 interner: Optional[Interner[H]] = None) -> "CSRGraph[H]":
+        order = sorted(range(len(pairs)), key=pairs.__getitem__)
+        offsets = array('q', bytes(8 * (vertex_count + 1)))
+        for source, _ in pairs:
+            offsets[source + 1] += 1
+        for vertex in range(vertex_count):
+            offsets[vertex + 1] += offsets[vertex]
+        targets = array('q', (pairs[i][1] for i in order))
+        weights = array('d', (costs[i] for i in order)) if costs is not None else None
+        return cls(offsets, targets, weights, interner)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    def vertex(self, label: H) -> int:
+        if self.interner is None:
+            raise ValueError("Graph was built from ids, it has no labels")
+        return self.interner.ids[label]
+
+    def label(self, vertex: int) -> H:
+        if self.interner is None:
+            raise ValueError("Graph was built from ids, it has no labels")
+        return self.interner.labels[vertex]
+
+    def neighbours(self, vertex: int) -> array:
+        return self.targets[self.offsets[vertex]:self.offsets[vertex + 1]]
+
+    def has_edge(self, source: int, target: int) -> bool:
+        start, end = self.offsets[source], self.offsets[source + 1]
+        position = bisect_left(self.targets, target, start, end)
+        return position < end and bool(self.targets[position] == target)
+
+    def in_degrees(self) -> List[int]:
+        degrees = [0] * len(self)
+        for target in self.targets:
+            degrees[target] += 1
+        return degrees
+
+    def subgraph(self, vertices: Sequence[int]) -> "CSRGraph[int]":
+        """Graph induced by ``vertices``; vertex ``i`` of the result is ``vertices[i]``, which is its label."""
+        local = {vertex: i for i, vertex in enumerate(vertices)}
+        pairs, costs = [], []
+        for i, vertex in enumerate(vertices):
+            for position in range(self.offsets[vertex], self.offsets[vertex + 1]):
+                target = local.get(self.targets[position])
+                if target is not None:
+                    pairs.append((i, target))
+                    costs.append(self.weights[position] if self.weights is not None else 1.0)
+        return CSRGraph.from_ids(len(vertices), pairs, costs if self.weights is not None else None,
+                                 Interner(vertices))
+
+    def topological_sort(self) -> List[int]:
+        """Kahn's algorithm on a copy of the in-degrees. Raises ``CycleError`` with one of the cycles."""
+        in_degree = self.in_degrees()
+        queue = deque(vertex for vertex, degree in enumerate(in_degree) if degree == 0)
+        order = []
+        while queue:
+            vertex = queue.popleft()
+            order.append(vertex)
+            for position in range(self.offsets[vertex], self.offsets[vertex + 1]):
+                target = self.targets[position]
+                in_degree[target] -= 1
+                if in_degree[target] == 0:
+                    queue.append(target)
+
+        if len(order) < len(self):
+            raise CycleError(self._find_cycle([degree > 0 for degree in in_degree]))
+        return order
+
+    def _find_cycle(self, remaining: List[bool]) -> List[int]:
+        """A cycle among the vertices Kahn's algorithm could not order.
+
+        Each of them has a predecessor that is also left over, so walking predecessors must revisit a vertex.
+        """
+        predecessor: Dict[int, int] = {}
+        for source in range(len(self)):
+            if remaining[source]:
+                for target in self.neighbours(source):
+                    if remaining[target]:
+                        predecessor.setdefault(target, source)
+        vertex = next(vertex for vertex in range(len(self)) if remaining[vertex])
+        seen: Dict[int, int] = {}
+        path: List[int] = []
+        while vertex not in seen:
+            seen[vertex] = len(path)
+            path.append(vertex)
+            vertex = predecessor[vertex]
+        return path[seen[vertex]:][::-1]
+
+    def bfs(self, source: int) -> List[int]:
+        """Number of edges from ``source`` to every vertex, -1 where unreachable."""
+        distances = [-1] * len(self)
+        distances[source] = 0
+        queue = deque([source])
+        while queue:
+            vertex = queue.popleft()
+            for target in self.neighbours(vertex):
+                if distances[target] < 0:
+                    distances[target] = distances[vertex] + 1
+                    queue.append(target)
+        return distances
+
+    def dfs(self, source: int) -> List[int]:
+        """Vertices reachable from ``source`` in depth-first preorder, visiting targets in ascending order."""
+        visited = [False] * len(self)
+        order = []
+        stack = [source]
+        while stack:
+            vertex = stack.pop()
+            if visited[vertex]:
+                continue
+            visited[vertex] = True
+            order.append(vertex)
+            stack.extend(reversed(self.neighbours(vertex)))
+        return order
+
+    def dijkstra(self, source: int, target: Optional[int] = None) -> Tuple[List[float], List[int]]:
+        """Shortest distances from ``source`` (``INFINITY`` where unreachable) and each vertex's predecessor.
+
+        Edges without weights cost 1. Stops early once ``target`` is settled.
+        """
+        return self.astar(source, target, None)
+
+    def astar(self, source: int, target: Optional[int],
+              heuristic: Optional[Callable[[int], float]]) -> Tuple[List[float], List[int]]:
+        """Dijkstra guided by ``heuristic``, an admissible estimate of the remaining cost to ``target``."""
+        distances = [INFINITY] * len(self)
+        previous = [-1] * len(self)
+        distances[source] = 0.0
+        heap: List[Tuple[float, int]] = [(heuristic(source) if heuristic else 0.0, source)]
+        settled = [False] * len(self)
+        while heap:
+            _, vertex = heapq.heappop(heap)
+            if settled[vertex]:
+                continue
+            settled[vertex] = True
+            if vertex == target:
+                break
+            for position in range(self.offsets[vertex], self.offsets[vertex + 1]):
+                neighbour = self.targets[position]
+                cost = distances[vertex] + (self.weights[position] if self.weights is not None else 1.0)
+                if cost < distances[neighbour]:
+                    distances[neighbour] = cost
+                    previous[neighbour] = vertex
+                    heapq.heappush(heap, (cost + (heuristic(neighbour) if heuristic else 0.0), neighbour))
+        return distances, previous
+
+    @staticmethod
+    def path(previous: List[int], target: int) -> List[int]:
+        """Vertices from the search source to ``target`` along the predecessors of ``dijkstra``/``astar``."""
+        path = [target]
+        while previous[path[-1]] >= 0:
+            path.append(previous[path[-1]])
+        return path[::-1]
+
+    def connected_components(self) -> List[int]:
+        """Component id of every vertex, ignoring edge direction (weakly connected components)."""
+        parent = list(range(len(self)))
+
+        def find(vertex: int) -> int:
+            while parent[vertex] != vertex:
+                parent[vertex] = parent[parent[vertex]]
+                vertex = parent[vertex]
+            return vertex
+
+        for source in range(len(self)):
+            for target in self.neighbours(source):
+                root_source, root_target = find(source), find(target)
+                if root_source != root_target:
+                    parent[max(root_source, root_target)] = min(root_source, root_target)
+
+        components: Dict[int, int] = {}
+        return [components.setdefault(find(vertex), len(components)) for vertex in range(len(self))]
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import io
+from functools import cached_property
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from tools.lazy import np
+
+Direction = Tuple[int, int]  # (row step, column step)
+
+DIRECTIONS_4: Tuple[Direction, ...] = ((-1, 0), (0, 1), (1, 0), (0, -1))
+DIRECTIONS_8: Tuple[Direction, ...] = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+
+
+BAND_BYTES = 1 << 18  # Input bytes per band in row_bands, which bounds the working set of band-wise scans
+
+
+def _code(value: Union[str, int]) -> int:
+    return ord(value) if isinstance(value, str) else value
+
+
+def _row_width(buffer: Union[bytes, memoryview], probe: int) -> int:
+    """Length of the first row, looking at a growing prefix so a long input is never copied whole."""
+    while True:
+        width = bytes(buffer[:probe]).find(b"\n")
+        if width >= 0:
+            return width
+        if probe >= len(buffer):
+            return len(buffer)
+        probe *= 4
+
+
+def row_bands(source: Union[bytes, memoryview, io.BufferedIOBase], overlap: int,
+              band_bytes: int = BAND_BYTES) -> Iterator[Tuple[np.ndarray, int]]:
+    """Newline-separated rows as consecutive ``uint8`` bands, each repeating the first ``overlap`` rows of the next.
+
+    Yields ``(band, anchors)``: patterns starting in the first ``anchors`` rows of a band fit in it, and every row
+    is an anchor row of exactly one band, so summing per-band counts over those rows counts each match once.
+    ``source`` is a buffer, viewed without copying, or a binary file, read into one reused buffer; either way only
+    about ``band_bytes`` of input are held at a time. Bands are only valid until the next one is requested.
+    """
+    if isinstance(source, io.BufferedIOBase):
+        yield from _file_bands(source, overlap, band_bytes)
+        return
+
+    flat = np.frombuffer(source, dtype=np.uint8)
+    if not len(flat):
+        return
+    stride = _row_width(source, band_bytes) + 1
+    total = (len(flat) + 1) // stride
+    band_rows = max(band_bytes // stride, 1)
+    for first in range(0, total, band_rows):
+        rows = min(band_rows + overlap, total - first)
+        band = np.lib.stride_tricks.as_strided(flat[first * stride:], shape=(rows, stride - 1), strides=(stride, 1),
+                                               writeable=False)
+        yield band, min(band_rows, rows)
+
+
+def _file_bands(file: io.BufferedIOBase, overlap: int, band_bytes: int) -> Iterator[Tuple[np.ndarray, int]]:
+    start = file.tell()
+    stride = len(file.readline().rstrip(b"\n")) + 1
+    file.seek(start)
+    band_rows = max(band_bytes // stride, 1)
+    buffer = bytearray((band_rows + overlap) * stride)
+    view = memoryview(buffer)
+    kept = 0  # rows carried over from the end of the previous band
+    while True:
+        filled = kept * stride
+        while filled < len(buffer):
+            read = file.readinto(view[filled:])
+            if not read:
+                break
+            filled += read
+        # The last row may lack its newline
+        rows = (filled + 1) // stride
+        if not rows:
+            return
+        band = np.lib.stride_tricks.as_strided(np.frombuffer(buffer, dtype=np.uint8), shape=(rows, stride - 1),
+                                               strides=(stride, 1), writeable=False)
+        if filled < len(buffer):
+            yield band, rows  # End of the input: every remaining row is an anchor
+            return
+        yield band, band_rows
+        view[:overlap * stride] = view[band_rows * stride:]
+        kept = overlap
+
+
+class Grid:
+    """Character grid stored as one contiguous ``uint8`` array, one byte per cell.
+
+    With ``pad`` the cells are surrounded by that many rings of ``fill``, so neighbour and shift operations near
+    the edges read the fill value instead of needing bounds checks. ``cells`` is the unpadded view, ``array``
+    the whole buffer.
+    """
+
+    def __init__(self, cells: np.ndarray, pad: int = 0, fill: Union[str, int] = 0) -> None:
+        if cells.ndim != 2:
+            raise ValueError("A grid needs a 2D array")
+        self.pad = pad
+        self.fill = _code(fill)
+        if pad:
+            self.array = np.pad(cells.astype(np.uint8, copy=False), pad, constant_values=self.fill)
+        else:
+            self.array = np.ascontiguousarray(cells, dtype=np.uint8)
+        self.array.flags.writeable = False
+        self.cells = self.array[pad:self.array.shape[0] - pad, pad:self.array.shape[1] - pad]
+        self._masks: Dict[int, np.ndarray] = {}
+
+    @classmethod
+    def from_lines(cls, lines: Sequence[str], pad: int = 0, fill: Union[str, int] = 0) -> Grid:
+        if not lines:
+            raise ValueError("Empty grid provided")
+        width = len(lines[0])
+        cells = np.frombuffer("".join(lines).encode(), dtype=np.uint8).reshape(len(lines), width)
+        return cls(cells, pad, fill)
+
+    @classmethod
+    def from_bytes(cls, buffer: Union[bytes, memoryview], pad: int = 0, fill: Union[str, int] = 0) -> Grid:
+        """Grid from newline-separated rows, e.g. ``Problem.buffer``; the newline column is dropped."""
+        flat = np.frombuffer(buffer, dtype=np.uint8)
+        if not len(flat):
+            raise ValueError("Empty grid provided")
+        newlines = np.flatnonzero(flat == ord("\n"))
+        width = int(newlines[0]) if len(newlines) else len(flat)
+        rows = (len(flat) + 1) // (width + 1)
+        cells = np.lib.stride_tricks.as_strided(flat, shape=(rows, width), strides=(width + 1, 1), writeable=False)
+        return cls(cells, pad, fill)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.cells.shape[0], self.cells.shape[1]
+
+    def __str__(self) -> str:
+        return "\n".join(row.tobytes().decode() for row in self.cells)
+
+    def at(self, row: int, col: int) -> str:
+        return chr(self.cells[row, col])
+
+    def row(self, index: int) -> np.ndarray:
+        return np.asarray(self.cells[index])
+
+    def column(self, index: int) -> np.ndarray:
+        return self.cells[:, index]
+
+    @cached_property
+    def diagonals(self) -> List[np.ndarray]:
+        """Top-left to bottom-right diagonals as views, from the bottom-left corner to the top-right one."""
+        rows, cols = self.shape
+        return [self.cells.diagonal(offset) for offset in range(-rows + 1, cols)]
+
+    @cached_property
+    def anti_diagonals(self) -> List[np.ndarray]:
+        """Top-right to bottom-left diagonals as views, from the top-left corner to the bottom-right one."""
+        rows, cols = self.shape
+        flipped = self.cells[:, ::-1]
+        return [flipped.diagonal(offset) for offset in range(cols - 1, -rows, -1)]
+
+    def mask(self, value: Union[str, int]) -> np.ndarray:
+        """Cached boolean array over the padded buffer, true where the cell holds ``value``."""
+        code = _code(value)
+        if code not in self._masks:
+            mask = self.array == code
+            mask.flags.writeable = False
+            self._masks[code] = mask
+        return self._masks[code]
+
+    def shifted(self, array: np.ndarray, direction: Direction, length: int) -> List[np.ndarray]:
+        """Aligned views of ``array`` for every step of a ``length``-cell walk along ``direction``.
+
+        Element ``[i, j]`` of the ``k``-th view is ``k`` steps away from the walk's start, so combining the views
+        element-wise evaluates every walk that fits in the padded buffer at once.
+        """
+        dr, dc = direction
+        extent_r, extent_c = (length - 1) * dr, (length - 1) * dc
+        height, width = array.shape[0] - abs(extent_r), array.shape[1] - abs(extent_c)
+        if height <= 0 or width <= 0:
+            return []
+        row, col = max(0, -extent_r), max(0, -extent_c)
+        return [array[row + k * dr:row + k * dr + height, col + k * dc:col + k * dc + width] for k in range(length)]
+
+    def count_word(self, word: str, directions: Sequence[Direction] = DIRECTIONS_8) -> int:
+        """Occurrences of ``word`` read along each of ``directions``, found with whole-array comparisons."""
+        total = 0
+        scratch: Optional[np.ndarray] = None
+        for direction in directions:
+            if not self.shifted(self.array, direction, len(word)):
+                continue
+            letters = [self.shifted(self.mask(letter), direction, len(word))[k] for k, letter in enumerate(word)]
+            if scratch is None:
+                scratch = np.empty(self.array.shape, dtype=bool)
+            found = scratch[:letters[0].shape[0], :letters[0].shape[1]]
+            np.copyto(found, letters[0])
+            for letter in letters[1:]:
+                np.logical_and(found, letter, out=found)
+            total += int(np.count_nonzero(found))
+        return total
+
+    def match(self, pattern: Sequence[str], wildcard: str = ".") -> np.ndarray:
+        """Boolean array over the padded buffer, true where ``pattern`` matches with its top-left corner there.
+
+        Cells of the pattern holding ``wildcard`` match anything.
+        """
+        height, width = len(pattern), len(pattern[0])
+        rows, cols = self.array.shape[0] - height + 1, self.array.shape[1] - width + 1
+        found = np.ones((max(rows, 0), max(cols, 0)), dtype=bool)
+        for dr, line in enumerate(pattern):
+            for dc, char in enumerate(line):
+                if char != wildcard:
+                    np.logical_and(found, self.mask(char)[dr:dr + rows, dc:dc + cols], out=found)
+        return found
+
+    def count(self, pattern: Sequence[str], wildcard: str = ".") -> int:
+        return int(np.count_nonzero(self.match(pattern, wildcard)))
+
+    def neighbours(self, row: int, col: int,
+                   directions: Sequence[Direction] = DIRECTIONS_4) -> Iterator[Tuple[int, int, str]]:
+        """In-bounds neighbours of a cell as ``(row, col, char)``."""
+        rows, cols = self.shape
+        for dr, dc in directions:
+            r, c = row + dr, col + dc
+            if 0 <= r < rows and 0 <= c < cols:
+                yield r, c, chr(self.cells[r, c])
+
+    def count_neighbours(self, value: Union[str, int], directions: Sequence[Direction] = DIRECTIONS_8) -> np.ndarray:
+        """For every cell, how many of its neighbours hold ``value``; cells past the edges count as not holding it."""
+        mask = self.mask(value)[self.pad:self.array.shape[0] - self.pad, self.pad:self.array.shape[1] - self.pad]
+        counts = np.zeros(self.shape, dtype=np.uint8)
+        rows, cols = self.shape
+        for dr, dc in directions:
+            target = counts[max(0, -dr):rows - max(0, dr), max(0, -dc):cols - max(0, dc)]
+            target += mask[max(0, dr):rows - max(0, -dr), max(0, dc):cols - max(0, -dc)]
+        return counts
@@ -1,36 +1,270 @@
+import argparse
+import contextlib
 import importlib
+import io
 import os
+import subprocess
 import sys
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    # Allow running as ``python tools/helpers.py`` as well as ``python -m tools.helpers``
+    sys.path.insert(0, str(PROJECT_ROOT))
 
-def check_all_problems(year: Optional[int] = 2024) -> None:
+from tools.cache import CacheConfig  # noqa: E402
+from tools.memory import MEMORY_MODES, MemoryConfig  # noqa: E402
+from tools.problem import LOAD_MODES  # noqa: E402
+from tools.registry import discover  # noqa: E402
+from tools.sandbox import SandboxConfig  # noqa: E402
+from tools.timing import TimingConfig  # noqa: E402
+
+GRANULARITIES = ("day", "part", "implementation")
+
+# What a worker sends back: its printed output, the input it used and its results per part
+TaskOutcome = Tuple[str, Optional[str], Dict[int, List[Any]]]
+
+
+@dataclass(frozen=True)
+class RunOptions:
+    """Harness settings applied to every problem, shipped as-is to worker processes."""
+    timing: Optional[TimingConfig] = None
+    memory: Optional[MemoryConfig] = None
+    load_mode: Optional[str] = None
+    profiler: Optional[str] = None  # profile instead of checking, see tools/profiling.py
+    profile_dir: Optional[str] = None
+    sandbox: Optional[SandboxConfig] = None
+    cache: Optional[CacheConfig] = None
+
+
+@dataclass(frozen=True)
+class CheckTask:
+    year: int
+    day: int
+    part: Optional[int] = None
+    implementation: Optional[str] = None
+    options: RunOptions = RunOptions()
+
+    @property
+    def label(self) -> str:
+        label = f"Day {self.day}"
+        if self.part is not None:
+            label += f" part {self.part}"
+        if self.implementation is not None:
+            label += f" <{self.implementation}>"
+        return label
+
+
+def setup_project_root() -> Path:
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
+    os.chdir(PROJECT_ROOT)
+    return PROJECT_ROOT
+
+
+def available_days(year: int) -> List[int]:
+    data_dir = PROJECT_ROOT / str(year) / "data"
+    return [day for day in range(1, 26) if (data_dir / f"day{day}").exists()]
+
+
+def load_problem_class(year: int, day: int) -> Any:
+    module = importlib.import_module(f"{year}.solutions.day{day}")
+    return getattr(module, f"Day{day}")
+
+
+def create_problem(year: int, day: int, options: Optional[RunOptions] = None, load_example: bool = False) -> Any:
+    options = options or RunOptions()
+    problem_class = load_problem_class(year, day)
+    # Must be in place before __init__ loads the input and the solutions
+    if options.load_mode is not None:
+        problem_class.load_mode = options.load_mode
+    if options.cache is not None:
+        problem_class.cache_config = options.cache
+    problem = problem_class(load_example=load_example)
+    if options.timing is not None:
+        problem.timing_config = options.timing
+    if options.memory is not None:
+        problem.memory_config = options.memory
+    if options.sandbox is not None:
+        problem.sandbox_config = options.sandbox
+    return problem
+
+
+def _run_problem(problem: Any, options: RunOptions, implementation: Optional[str] = None,
+                 part: Optional[int] = None) -> Dict[int, List[Any]]:
+    if options.profiler is None:
+        return problem.check_solutions(implementation, only_part=part)  # type: ignore[no-any-return]
+
+    from tools.profiling import profile_problem
+
+    out_dir = Path(options.profile_dir) if options.profile_dir else PROJECT_ROOT / str(problem.year) / "profiles"
+    profile_problem(problem, out_dir, options.profiler, implementation, part)
+    return {}
+
+
+def _check_task(task: CheckTask) -> TaskOutcome:
+    """Run one task and return everything it printed, so parallel output stays grouped per task."""
+    setup_project_root()
+    buffer = io.StringIO()
+    data_path: Optional[str] = None
+    results: Dict[int, List[Any]] = {}
+    with contextlib.redirect_stdout(buffer):
+        try:
+            problem = create_problem(task.year, task.day, task.options)
+            data_path = problem.data_path
+            results = _run_problem(problem, task.options, task.implementation, task.part)
+        except ModuleNotFoundError as e:
+            print(f"Module not found for Day {task.day}: {e}")
+            print(f"Current sys.path: {sys.path}")
+        except Exception as e:
+            print(f"Error processing Day {task.day}: {e}")
+    return buffer.getvalue(), data_path, results
+
+
+def _build_tasks(year: int, days: List[int], granularity: str, options: RunOptions,
+                 implementation: Optional[str] = None, only_part: Optional[int] = None) -> List[CheckTask]:
+    parts = (1, 2) if only_part is None else (only_part,)
+    if granularity == "day":
+        return [CheckTask(year, day, only_part, implementation, options) for day in days]
+
+    registry = discover(year)
+    tasks: List[CheckTask] = []
+    for day in days:
+        if granularity == "part":
+            tasks.extend(CheckTask(year, day, part, implementation, options) for part in parts)
+            continue
+        info = registry.get(day)
+        if info is None or not info.implementations:
+            # Nothing to split statically; let the worker run (or report) the whole day
+            tasks.append(CheckTask(year, day, only_part, implementation, options))
+            continue
+        for part in parts:
+            tasks.extend(
+                CheckTask(year, day, part, name, options)
+                for name in info.implementation_names(part)
+                if implementation is None or name == implementation
+            )
+    return tasks
+
+
+def _run_parallel(tasks: List[CheckTask], workers: Optional[int],
+                  on_outcome: Optional[Callable[[CheckTask, TaskOutcome], None]] = None, max_crashes: int = 2) -> None:
+    """Run tasks on a process pool, printing each task's output in submission order.
+
+    Every worker process handles a single task, so a crash or heap growth in one day never leaks into
+    another. If a worker dies the whole pool breaks; the unfinished tasks are resubmitted to a fresh pool and
+    a task is only reported as crashed once it has broken the pool ``max_crashes`` times.
+    """
+    from concurrent.futures import Future, ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+
+    outputs: Dict[int, TaskOutcome] = {}
+    crashes: Dict[int, int] = {}
+    next_to_print = 0
+
+    while next_to_print < len(tasks):
+        pending = [i for i in range(next_to_print, len(tasks)) if i not in outputs]
+        with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as executor:
+            futures: Dict[int, Future[TaskOutcome]] = {i: executor.submit(_check_task, tasks[i]) for i in pending}
+            broken = False
+            for i in pending:
+                try:
+                    outputs[i] = futures[i].result()
+                except BrokenProcessPool:
+                    if not broken:
+                        # The first broken future in order is the most likely culprit
+                        crashes[i] = crashes.get(i, 0) + 1
+                        if crashes[i] >= max_crashes:
+                            outputs[i] = (f"Worker crashed while processing {tasks[i].label}\n", None, {})
+                    broken = True
+                    continue
+
+                while next_to_print < len(tasks) and next_to_print in outputs:
+                    outcome = outputs.pop(next_to_print)
+                    print(f"\nChecking {tasks[next_to_print].label}...")
+                    print(outcome[0], end="")
+                    if on_outcome is not None:
+                        on_outcome(tasks[next_to_print], outcome)
+                    next_to_print += 1
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """Parse ``-X importtime`` output into (module, self µs, cumulative µs, nesting depth) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def startup_report(year: int, days: Optional[List[int]] = None, top: int = 8) -> None:
+    """Import each day in a fresh interpreter under ``-X importtime`` and report where cold start time goes."""
+    setup_project_root()
+    registry = discover(year)
+    for day in days or list(registry):
+        if day not in registry:
+            print(f"No solution module found for Day {day}")
+            continue
+        module = registry[day].module
+        # __import__ goes through the C import path, which is what -X importtime instruments
+        code = f"import sys; sys.path.insert(0, {str(PROJECT_ROOT)!r}); __import__({module!r})"
+        completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                                   cwd=PROJECT_ROOT)
+        rows = parse_importtime(completed.stderr)
+        total = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+        own = next((cumulative for name, _, cumulative, _ in rows if name == module), 0)
+        print(f"\nDay {day} ({module}): {total / 1000:.1f}ms total imports, {own / 1000:.1f}ms for the module itself")
+        if completed.returncode != 0:
+            print(completed.stderr.strip().splitlines()[-1])
+        for name, self_us, cumulative_us, depth in sorted(rows, key=lambda row: row[1], reverse=True)[:top]:
+            print(f"  {self_us / 1000:>8.2f}ms self {cumulative_us / 1000:>8.2f}ms cum  {name}")
+
+
+def check_all_problems(year: Optional[int] = 2024, parallel: bool = False, workers: Optional[int] = None,
+                       granularity: str = "day", options: Optional[RunOptions] = None, record: bool = False,
+                       days: Optional[List[int]] = None, implementation: Optional[str] = None,
+                       part: Optional[int] = None) -> None:
+    year = year or 2024
+    options = options or RunOptions()
     print("--------------------")
     print(f"Checking all problems for year {year}")
 
-    project_root = Path(__file__).resolve().parent.parent
-    sys.path.insert(0, str(project_root))
+    setup_project_root()
+    days = [day for day in available_days(year) if days is None or day in days]
 
-    year_dir = project_root / str(year)
-    data_dir = year_dir / "data"
+    recorder: Optional[Callable[[int, Optional[str], Dict[int, List[Any]]], None]] = None
+    if record:
+        from tools.history import git_commit, history_path, new_run_id, record_results
 
-    os.chdir(project_root)
+        run_id, commit = new_run_id(), git_commit()
+        print(f"Recording run {run_id} ({commit}) to {history_path(year)}")
 
-    for day in range(1, 26):
-        try:
-            data_file = data_dir / f"day{day}"
-            if not data_file.exists():
-                # print(f"\nData file not found: {data_file}")
-                continue
+        def recorder(day: int, data_path: Optional[str], results: Dict[int, List[Any]]) -> None:
+            record_results(year, day, data_path, results, run_id, commit)
+
+    if parallel:
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Granularity must be one of {', '.join(GRANULARITIES)}")
 
-            print(f"\nChecking Day {day}...")
+        def on_outcome(task: CheckTask, outcome: TaskOutcome) -> None:
+            if recorder is not None:
+                recorder(task.day, outcome[1], outcome[2])
 
-            module_name = f"{year}.solutions.day{day}"
-            module = importlib.import_module(module_name)
-            problem_class = getattr(module, f"Day{day}")
-            problem = problem_class(load_example=False)
-            problem.check_solutions()
+        _run_parallel(_build_tasks(year, days, granularity, options, implementation, part), workers, on_outcome)
+        return
+
+    for day in days:
+        print(f"\nChecking Day {day}...")
+        try:
+            problem = create_problem(year, day, options)
+            results = _run_problem(problem, options, implementation, part)
+            if recorder is not None:
+                recorder(day, problem.data_path, results)
 
         except ModuleNotFoundError as e:
             print(f"Module not found for Day {day}: {e}")
@@ -39,13 +273,83 @@ def check_all_problems(year: Optional[int] = 2024) -> None:
             print(f"Error processing Day {day}: {e}")
 
 
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Check every Advent of Code solution for a year")
+    parser.add_argument("year", nargs="?", default="2024")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Run on a process pool with this many workers (default: sequential)")
+    parser.add_argument("--day", type=int, action="append", help="Only run this day (repeatable)")
+    parser.add_argument("--part", type=int, choices=(1, 2), help="Only run this part")
+    parser.add_argument("--implementation", help="Only run the implementation with this name")
+    parser.add_argument("--granularity", choices=GRANULARITIES, default="day",
+                        help="Unit of work sent to each worker in parallel mode")
+    defaults = TimingConfig()
+    parser.add_argument("--repeat", type=int, default=defaults.repeat, help="Timing samples per implementation")
+    parser.add_argument("--warmup", type=int, default=defaults.warmup, help="Untimed calls before sampling")
+    parser.add_argument("--min-sample-time", type=float, default=defaults.min_sample_time,
+                        help="Minimum seconds per sample, used to calibrate the loop count")
+    parser.add_argument("--keep-gc", action="store_true", help="Leave the garbage collector enabled while timing")
+    parser.add_argument("--memory", choices=MEMORY_MODES, default="peak",
+                        help="peak: tracemalloc peak only, rss: process RSS growth, deep: top allocation sites")
+    parser.add_argument("--top-sites", type=int, default=MemoryConfig.top_n,
+                        help="Allocation sites reported in deep memory mode")
+    parser.add_argument("--load-mode", choices=LOAD_MODES,
+                        help="Input representation loaded up front (default: each problem's own, usually lines)")
+    parser.add_argument("--profile", nargs="?", const="cprofile", choices=("cprofile", "sample"),
+                        help="Profile the implementations instead of checking them, writing .pstats and "
+                             "collapsed-stack files (default profiler: cprofile)")
+    parser.add_argument("--profile-dir", help="Where profiles are written (default: <year>/profiles)")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="Report the cold import time of each day instead of checking them")
+    parser.add_argument("--sandbox", action="store_true",
+                        help="Run each implementation in a child process, stopped by --timeout and --memory-limit")
+    parser.add_argument("--timeout", type=float, help="Seconds per implementation (implies --sandbox)")
+    parser.add_argument("--memory-limit", type=float, metavar="MIB",
+                        help="Extra memory an implementation may allocate, in MiB (implies --sandbox)")
+    parser.add_argument("--isolate", action="store_true",
+                        help="Measure each implementation in a fresh interpreter pinned to one core, reporting its "
+                             "cold first call next to the warm timings (implies --sandbox)")
+    parser.add_argument("--cpu", type=int, help="Core isolated runs are pinned to (implies --isolate)")
+    parser.add_argument("--cache", action="store_true",
+                        help="Keep parsed inputs and their parse timings on disk between runs (see tools/cache.py)")
+    parser.add_argument("--cache-size", type=float, default=CacheConfig.max_bytes / 2 ** 20, metavar="MIB",
+                        help="Size of the parse cache before least recently used entries are evicted")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running: on every change to the solutions, data or tools, re-run only the "
+                             "implementations whose source or input changed (see tools/watch.py)")
+    parser.add_argument("--watch-interval", type=float, default=1.0, help="Seconds between polls in watch mode")
+    parser.add_argument("--record", action="store_true",
+                        help="Append every result to the year's benchmark history (see tools/history.py)")
+    args = parser.parse_args(argv)
+
+    try:
+        year = int(args.year)
+    except ValueError:
+        print(f"Invalid year format: {args.year}")
+        sys.exit(1)
+
+    if args.startup_report:
+        startup_report(year, args.day)
+        return
+
+    timing = TimingConfig(repeat=args.repeat, warmup=args.warmup, min_sample_time=args.min_sample_time,
+                          disable_gc=not args.keep_gc)
+    memory_limit = int(args.memory_limit * 2 ** 20) if args.memory_limit is not None else None
+    isolate = args.isolate or args.cpu is not None
+    sandbox = SandboxConfig(enabled=args.sandbox or isolate or args.timeout is not None or memory_limit is not None,
+                            timeout=args.timeout, memory_limit=memory_limit, isolate=isolate, cpu=args.cpu)
+    options = RunOptions(timing=timing, memory=MemoryConfig(mode=args.memory, top_n=args.top_sites),
+                         load_mode=args.load_mode, profiler=args.profile, profile_dir=args.profile_dir,
+                         sandbox=sandbox, cache=CacheConfig(args.cache, max_bytes=int(args.cache_size * 2 ** 20)))
+    if args.watch:
+        from tools.watch import Watcher
+
+        Watcher(year, args.day, options, args.part, args.implementation, args.workers).run(args.watch_interval)
+        return
+    check_all_problems(year, parallel=args.workers is not None, workers=args.workers or None,
+                       granularity=args.granularity, options=options, record=args.record and not args.profile,
+                       days=args.day, implementation=args.implementation, part=args.part)
+
+
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        try:
-            year = int(sys.argv[1])
-            check_all_problems(year)
-        except ValueError:
-            print(f"Invalid year format: {sys.argv[1]}")
-            sys.exit(1)
-    else:
-        check_all_problems()
+    main()
@@ -0,0 +1,283 @@
+import argparse
+import hashlib
+import json
+import platform
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from colorama import Fore, Style
+
+from tools.problem import RunResult
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+HISTORY_FILE = "benchmarks.jsonl"
+
+Key = Tuple[int, int, int, str, str, str]
+
+
+def history_path(year: int) -> Path:
+    return PROJECT_ROOT / str(year) / HISTORY_FILE
+
+
+def new_run_id() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%fZ")
+
+
+def git_commit() -> str:
+    """Short HEAD hash, suffixed with ``+dirty`` when tracked files have uncommitted changes."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}+dirty" if status else commit
+
+
+def file_hash(path: Optional[str]) -> str:
+    if path is None:
+        return "none"
+    digest = hashlib.sha256()
+    with open(PROJECT_ROOT / path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def to_record(run_id: str, commit: str, year: int, day: int, part: int, input_hash: str,
+              result: RunResult) -> Dict[str, Any]:
+    timing = result.timing_stats
+    return {
+        "run_id": run_id,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "year": year,
+        "day": day,
+        "part": part,
+        "implementation": result.name,
+        "commit": commit,
+        "python": platform.python_version(),
+        "input_hash": input_hash,
+        "result": result.result,
+        "passed": result.passed,
+        "mean": timing.mean,
+        "std_dev": timing.std_dev,
+        "p50": timing.p50,
+        "p95": timing.p95,
+        "ci_low": timing.ci_low,
+        "ci_high": timing.ci_high,
+        "loops": timing.loops,
+        "samples": list(timing.samples),
+        "parse_mean": result.parse_stats.mean if result.parse_stats else None,
+        "cold_time": result.cold_time,
+        "phases": {phase.name: phase.mean for phase in result.phase_stats} if result.phase_stats else None,
+        "peak_memory": result.memory_stats.peak_memory,
+        "memory_mode": result.memory_stats.mode,
+    }
+
+
+def record_results(year: int, day: int, input_path: Optional[str], results: Dict[int, List[RunResult]],
+                   run_id: str, commit: Optional[str] = None) -> int:
+    """Append one record per implementation to the year's history file and return how many were written."""
+    commit = commit or git_commit()
+    input_hash = file_hash(input_path)
+    lines = [
+        json.dumps(to_record(run_id, commit, year, day, part, input_hash, result))
+        for part, part_results in sorted(results.items())
+        for result in part_results
+        if result.measured
+    ]
+    if lines:
+        with open(history_path(year), "a") as file:
+            file.write("\n".join(lines) + "\n")
+    return len(lines)
+
+
+def load_records(year: int) -> Iterator[Dict[str, Any]]:
+    path = history_path(year)
+    if not path.exists():
+        return
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def record_key(record: Dict[str, Any]) -> Key:
+    return (record["year"], record["day"], record["part"], record["implementation"], record["python"],
+            record["input_hash"])
+
+
+def latest_by_key(records: Iterable[Dict[str, Any]]) -> Dict[Key, Dict[str, Any]]:
+    latest: Dict[Key, Dict[str, Any]] = {}
+    for record in records:
+        key = record_key(record)
+        if key not in latest or record["run_id"] >= latest[key]["run_id"]:
+            latest[key] = record
+    return latest
+
+
+def run_spread(records: Iterable[Dict[str, Any]]) -> Dict[Key, float]:
+    """Standard deviation of each implementation's mean across the runs in ``records``, where there are several."""
+    means: Dict[Key, List[float]] = {}
+    for record in records:
+        means.setdefault(record_key(record), []).append(record["mean"])
+    return {key: statistics.stdev(values) for key, values in means.items() if len(values) > 1}
+
+
+@dataclass
+class Comparison:
+    key: Key
+    baseline: Dict[str, Any]
+    candidate: Dict[str, Any]
+    time_ratio: float
+    memory_ratio: float
+    slower: bool
+    more_memory: bool
+
+    @property
+    def regressed(self) -> bool:
+        return self.slower or self.more_memory
+
+
+def compare(baseline: Dict[Key, Dict[str, Any]], candidate: Dict[Key, Dict[str, Any]],
+            time_threshold: float = 0.05, memory_threshold: float = 0.10, min_delta: float = 0.005,
+            noise: float = 3.0, min_samples: int = 5,
+            spread: Optional[Dict[Key, float]] = None) -> List[Comparison]:
+    """Compare matching implementations between two sets of records.
+
+    A slowdown is only flagged when the mean grew by more than ``time_threshold`` and the candidate's bootstrap
+    confidence interval lies entirely above the baseline's. The intervals come from a handful of samples taken
+    within one process, so they miss run-to-run variance; the mean must also have grown by at least ``min_delta``
+    milliseconds and by ``noise`` times the largest of the two standard deviations and the baseline's ``spread``
+    across runs (see ``run_spread``), and both sides need ``min_samples`` samples, before a slowdown counts.
+    Recording the baseline several times is what lets the check see how much whole runs vary.
+    """
+    spread = spread or {}
+    comparisons = []
+    for key in sorted(baseline.keys() & candidate.keys()):
+        base, cand = baseline[key], candidate[key]
+        time_ratio = cand["mean"] / base["mean"] if base["mean"] else 1.0
+        delta = cand["mean"] - base["mean"]
+        noise_floor = max(min_delta, noise * max(base["std_dev"], cand["std_dev"], spread.get(key, 0.0)))
+        enough_samples = min(len(base.get("samples", ())), len(cand.get("samples", ()))) >= min_samples
+        same_memory_mode = cand.get("memory_mode", "peak") == base.get("memory_mode", "peak")
+        memory_ratio = cand["peak_memory"] / base["peak_memory"] if base["peak_memory"] and same_memory_mode else 1.0
+        comparisons.append(Comparison(
+            key=key,
+            baseline=base,
+            candidate=cand,
+            time_ratio=time_ratio,
+            memory_ratio=memory_ratio,
+            slower=(time_ratio > 1 + time_threshold and cand["ci_low"] > base["ci_high"] and delta > noise_floor
+                    and enough_samples),
+            more_memory=memory_ratio > 1 + memory_threshold,
+        ))
+    return comparisons
+
+
+def _select(records: List[Dict[str, Any]], commit: Optional[str], run_id: Optional[str]) -> List[Dict[str, Any]]:
+    if run_id is not None:
+        return [r for r in records if r["run_id"] == run_id]
+    if commit is not None:
+        return [r for r in records if r["commit"].startswith(commit)]
+    last_run = max((r["run_id"] for r in records), default=None)
+    return [r for r in records if r["run_id"] == last_run]
+
+
+def _print_comparisons(comparisons: List[Comparison]) -> None:
+    for comparison in comparisons:
+        _, day, part, name, _, _ = comparison.key
+        if comparison.regressed:
+            color, label = Fore.RED, "REGRESSION"
+        elif comparison.time_ratio < 1:
+            color, label = Fore.GREEN, "ok"
+        else:
+            color, label = Fore.RESET, "ok"
+        flags = []
+        if comparison.slower:
+            flags.append("slower")
+        if comparison.more_memory:
+            flags.append("more memory")
+        print(
+            f"{color}Day {day} part {part} - {name}: {label} "
+            f"time x{comparison.time_ratio:.2f} ({comparison.baseline['mean']:.4f}ms -> "
+            f"{comparison.candidate['mean']:.4f}ms), "
+            f"peak x{comparison.memory_ratio:.2f}"
+            f"{' [' + ', '.join(flags) + ']' if flags else ''}{Style.RESET_ALL}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Inspect and compare recorded benchmark runs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    runs_parser = subparsers.add_parser("runs", help="List recorded runs")
+    runs_parser.add_argument("year", type=int, nargs="?", default=2024)
+
+    compare_parser = subparsers.add_parser("compare", help="Flag regressions against a baseline")
+    compare_parser.add_argument("year", type=int, nargs="?", default=2024)
+    compare_parser.add_argument("--baseline", help="Baseline git commit (prefix)")
+    compare_parser.add_argument("--baseline-run", help="Use this run id instead of the latest one for the commit")
+    compare_parser.add_argument("--candidate", help="Candidate git commit (default: latest recorded run)")
+    compare_parser.add_argument("--candidate-run", help="Candidate run id")
+    compare_parser.add_argument("--time-threshold", type=float, default=0.05,
+                                help="Relative slowdown that counts as a regression")
+    compare_parser.add_argument("--memory-threshold", type=float, default=0.10,
+                                help="Relative peak-memory growth that counts as a regression")
+    compare_parser.add_argument("--min-delta", type=float, default=0.005,
+                                help="Smallest slowdown in milliseconds that counts as a regression")
+    compare_parser.add_argument("--noise", type=float, default=3.0,
+                                help="Slowdowns within this many standard deviations are treated as noise")
+    compare_parser.add_argument("--min-samples", type=int, default=5,
+                                help="Timing samples both sides need before a slowdown is flagged")
+    args = parser.parse_args(argv)
+
+    if args.command == "compare" and args.baseline is None and args.baseline_run is None:
+        parser.error("compare needs --baseline or --baseline-run")
+
+    records = list(load_records(args.year))
+    if not records:
+        print(f"No benchmark history found in {history_path(args.year)}")
+        sys.exit(1)
+
+    if args.command == "runs":
+        runs: Dict[str, Tuple[str, int]] = {}
+        for record in records:
+            commit, count = runs.get(record["run_id"], (record["commit"], 0))
+            runs[record["run_id"]] = (commit, count + 1)
+        for run_id, (commit, count) in sorted(runs.items()):
+            print(f"{run_id}  {commit:<16} {count} results")
+        return
+
+    candidate_records = _select(records, args.candidate, args.candidate_run)
+    candidate_runs = {record["run_id"] for record in candidate_records}
+    # Never compare a run against itself when baseline and candidate share a commit
+    baseline_records = [r for r in _select(records, args.baseline, args.baseline_run) if r["run_id"] not in candidate_runs]
+    baseline = latest_by_key(baseline_records)
+    candidate = latest_by_key(candidate_records)
+    if not baseline or not candidate:
+        print(f"{Fore.RED}Missing records for the baseline or the candidate{Style.RESET_ALL}")
+        sys.exit(1)
+
+    comparisons = compare(baseline, candidate, args.time_threshold, args.memory_threshold, args.min_delta, args.noise,
+                          args.min_samples, run_spread(baseline_records))
+    if not comparisons:
+        print(f"{Fore.YELLOW}No implementations in common between baseline and candidate{Style.RESET_ALL}")
+        return
+
+    _print_comparisons(comparisons)
+    regressions = sum(comparison.regressed for comparison in comparisons)
+    if regressions:
+        print(f"\n{Fore.RED}{regressions} regression(s) found{Style.RESET_ALL}")
+        sys.exit(1)
+    print(f"\n{Fore.GREEN}No regressions found{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
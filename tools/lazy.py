@@ -0,0 +1,44 @@
+import importlib.util
+import sys
+from types import ModuleType
+from typing import TYPE_CHECKING, Dict
+
+# Modules handed out by ``lazy_import``, by identity, whether or not their code has run yet
+_deferred: Dict[int, ModuleType] = {}
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return ``name`` as a module whose code only runs on first attribute access.
+
+    Lets a module bind a heavy dependency at import time without paying for it unless a code path uses it.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    _deferred[id(module)] = module
+    return module
+
+
+def load_deferred(module: ModuleType) -> None:
+    """Run the deferred imports ``module`` refers to, e.g. before a memory cap or a measurement they would skew."""
+    for value in list(vars(module).values()):
+        if id(value) in _deferred and _deferred[id(value)] is value:
+            getattr(value, "__name__")  # Any attribute access runs the module's code
+
+
+# NumPy for solutions and tools that only need it in some code paths: ``from tools.lazy import np``
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = lazy_import("numpy")
+
+__all__ = ["lazy_import", "np"]
@@ -0,0 +1,122 @@
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, List, Tuple, TypeVar
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+T = TypeVar("T")
+
+MEMORY_MODES = ("peak", "rss", "deep")
+
+
+@dataclass
+class MemoryConfig:
+    mode: str = "peak"
+    top_n: int = 10  # allocation sites reported in deep mode
+    frames: int = 1  # traceback depth recorded per allocation in deep mode
+
+
+@dataclass
+class AllocationSite:
+    location: str
+    size_diff: int
+    count_diff: int
+
+
+@dataclass
+class MemoryStats:
+    peak_memory: int
+    current_memory: int
+    memory_blocks: int = 0
+    mode: str = "peak"
+    top_sites: List[AllocationSite] = field(default_factory=list)
+
+
+def _current_rss() -> int:
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _max_rss() -> int:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return int(max_rss if sys.platform == "darwin" else max_rss * 1024)
+
+
+def measure_peak(func: Callable[[], T]) -> Tuple[T, MemoryStats]:
+    """Python heap peak through tracemalloc, without taking snapshots."""
+    tracemalloc.start()
+    try:
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, MemoryStats(peak_memory=peak, current_memory=current, mode="peak")
+
+
+def measure_rss(func: Callable[[], T]) -> Tuple[T, MemoryStats]:
+    """Process RSS growth. No tracing overhead, but includes native allocations and page-level noise.
+
+    The peak is the growth of the process high-water mark, so it reads 0 when the function stays below a peak
+    reached earlier in the process.
+    """
+    if resource is None:
+        return measure_peak(func)
+
+    max_before, rss_before = _max_rss(), _current_rss()
+    result = func()
+    return result, MemoryStats(
+        peak_memory=max(_max_rss() - max_before, 0),
+        current_memory=max(_current_rss() - rss_before, 0),
+        mode="rss",
+    )
+
+
+def measure_deep(func: Callable[[], T], top_n: int = 10, frames: int = 1) -> Tuple[T, MemoryStats]:
+    """Peak plus the allocation sites that grew the most, diffed against a snapshot taken right before the call."""
+    tracemalloc.start(frames)
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "traceback" if frames > 1 else "lineno")
+    diff.sort(key=lambda stat: stat.size_diff, reverse=True)
+
+    sites = [
+        AllocationSite(
+            location=" <- ".join(f"{frame.filename}:{frame.lineno}" for frame in stat.traceback),
+            size_diff=stat.size_diff,
+            count_diff=stat.count_diff,
+        )
+        for stat in diff[:top_n]
+        if stat.size_diff > 0
+    ]
+    return result, MemoryStats(
+        peak_memory=peak,
+        current_memory=current,
+        memory_blocks=sum(stat.count_diff for stat in diff if stat.count_diff > 0),
+        mode="deep",
+        top_sites=sites,
+    )
+
+
+def measure(func: Callable[[], T], config: MemoryConfig) -> Tuple[T, MemoryStats]:
+    if config.mode == "rss":
+        return measure_rss(func)
+    if config.mode == "deep":
+        return measure_deep(func, config.top_n, config.frames)
+    return measure_peak(func)
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import atexit
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from tools.lazy import np
+
+R = TypeVar("R")
+
+MIN_ROWS = 20_000  # Below this, shipping chunks to workers costs more than the work itself
+PARALLEL_SUFFIX = ", parallel"  # naming convention pairing a parallel implementation with its serial one
+
+# (shared memory block name, shape, dtype) of each array, all a worker needs to map it
+ArraySpec = Tuple[str, Tuple[int, ...], str]
+
+_executors: Dict[Tuple[int, int], ProcessPoolExecutor] = {}  # by (owning process, workers)
+_live: "weakref.WeakSet[SharedArrays]" = weakref.WeakSet()
+_attached: Dict[str, Tuple[shared_memory.SharedMemory, np.ndarray]] = {}  # per worker process
+
+
+def available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _release(blocks: List[shared_memory.SharedMemory]) -> None:
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            pass  # A view is still alive somewhere; the mapping goes away with it
+        block.unlink()
+
+
+class SharedArrays:
+    """NumPy arrays copied once into shared memory, so workers map them by name instead of unpickling copies.
+
+    ``arrays`` are views of the shared blocks, usable in this process like the originals. The blocks are unlinked
+    when the object is garbage collected or ``release``d, so keep it (e.g. as a parse result) for as long as workers
+    use it.
+    """
+
+    def __init__(self, *arrays: np.ndarray) -> None:
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.arrays: List[np.ndarray] = []
+        self.specs: List[ArraySpec] = []
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            view: np.ndarray = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+            view[...] = array
+            self._blocks.append(block)
+            self.arrays.append(view)
+            self.specs.append((block.name, array.shape, array.dtype.str))
+        self._owner = os.getpid()
+        self._finalizer = weakref.finalize(self, _release, self._blocks)
+        _live.add(self)
+
+    def release(self) -> None:
+        """Unlink the blocks now; the arrays must not be used afterwards."""
+        self._finalizer()
+
+    def __len__(self) -> int:
+        return len(self.arrays[0]) if self.arrays else 0
+
+    def __getstate__(self) -> None:
+        raise TypeError("Shared arrays are tied to this process's lifetime and cannot be pickled")
+
+
+def _attach(spec: ArraySpec) -> np.ndarray:
+    name, shape, dtype = spec
+    if name not in _attached:
+        block = shared_memory.SharedMemory(name=name)
+        _attached[name] = block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    return _attached[name][1]
+
+
+def _detach_others(names: Sequence[str]) -> None:
+    """Unmap blocks from earlier calls, whose arrays the parent has since dropped."""
+    for name in [name for name in _attached if name not in names]:
+        block, _ = _attached.pop(name)
+        try:
+            block.close()
+        except BufferError:
+            pass
+
+
+def _run_chunk(func: Callable[..., R], specs: List[ArraySpec], split: Sequence[int], start: int, end: int) -> R:
+    """Worker entry point: map the arrays and call ``func`` on rows ``start:end`` of the split ones."""
+    _detach_others([name for name, _, _ in specs])
+    arrays = [_attach(spec) for spec in specs]
+    return func(*(array[start:end] if i in split else array for i, array in enumerate(arrays)))
+
+
+def shared_executor(workers: int) -> ProcessPoolExecutor:
+    """Pool reused across calls, so timing loops measure the work rather than process start-up.
+
+    Pools belong to the process that created them; a forked child gets its own rather than its parent's.
+    """
+    key = (os.getpid(), workers)
+    if key not in _executors:
+        _executors[key] = ProcessPoolExecutor(max_workers=workers)
+    return _executors[key]
+
+
+def shutdown() -> None:
+    """Shut down this process's pools and unlink the shared arrays it created.
+
+    Runs at interpreter exit; processes that skip ``atexit`` handlers, like ``multiprocessing`` children, call it
+    before they exit.
+    """
+    pid = os.getpid()
+    for key in [key for key in _executors if key[0] == pid]:
+        _executors.pop(key).shutdown(cancel_futures=True)
+    for shared in list(_live):
+        if shared._owner == pid:
+            shared.release()
+
+
+atexit.register(shutdown)
+
+
+def parallel_map(func: Callable[..., R], shared: SharedArrays, reduce: Callable[[List[R]], Any],
+                 split: Optional[Sequence[int]] = None, workers: Optional[int] = None,
+                 min_rows: int = MIN_ROWS) -> Any:
+    """Call ``func`` on contiguous row chunks of ``shared`` across a process pool and ``reduce`` the results.
+
+    ``func`` must be a module-level function taking the arrays in order; the ones listed in ``split`` (default:
+    all) are cut into one chunk per worker, the others are passed whole. Chunk results reach ``reduce`` in row
+    order. With fewer than ``min_rows`` rows or a single worker, ``func`` runs once in-process on everything.
+    """
+    split = range(len(shared.arrays)) if split is None else split
+    workers = workers or available_cpus()
+    rows = len(shared.arrays[split[0]]) if split else 0
+    if workers <= 1 or rows < max(min_rows, 2):
+        return reduce([func(*shared.arrays)])
+
+    chunk = -(-rows // workers)
+    starts = list(range(0, rows, chunk))
+    futures = [shared_executor(workers).submit(_run_chunk, func, shared.specs, split, start, start + chunk)
+               for start in starts]
+    return reduce([future.result() for future in futures])
+
+
+def sum_tuples(results: List[Tuple[int, ...]]) -> Tuple[int, ...]:
+    """Element-wise sum of per-chunk result tuples, a common ``reduce``."""
+    return tuple(sum(values) for values in zip(*results))
@@ -0,0 +1,80 @@
+import argparse
+import contextlib
+import io
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from colorama import Fore, Style
+
+from tools.helpers import available_days, load_problem_class, setup_project_root
+from tools.problem import Problem
+from tools.timing import TimingConfig, TimingStats, measure
+
+
+def day_parsers(problem: Problem) -> Dict[str, Tuple[Callable[[], Any], str]]:
+    """Every distinct parse step of a day, with the input representation it reads.
+
+    ``parse`` comes first when the day overrides it; the inherited one just returns the lines, so it is skipped.
+    """
+    parsers: Dict[str, Tuple[Callable[[], Any], str]] = {}
+    if type(problem).parse is not Problem.parse:
+        parsers["parse"] = (problem.parse, "lines")
+    for implementations in problem.implementations.values():
+        for impl in implementations.values():
+            if impl.parser is not None:
+                parsers.setdefault(impl.parser.__name__, (impl.parser, impl.data_mode))
+    return parsers
+
+
+def benchmark_parsers(problem: Problem, config: TimingConfig) -> List[Tuple[str, str, TimingStats]]:
+    """Time each parser directly, bypassing the ``parsed_with`` cache; the input itself is loaded beforehand."""
+    results = []
+    for name, (parser, mode) in day_parsers(problem).items():
+        problem.load(mode)
+        results.append((name, mode, measure(parser, config)))
+    return results
+
+
+def print_benchmark(problem: Problem, size: int, results: List[Tuple[str, str, TimingStats]]) -> None:
+    """One line per parser: mean time, time per input unit and, when the day has its own ``parse``, the speedup."""
+    print(f"\n{Fore.CYAN}Parsing Day {problem.day}: <<{problem.name}>>, {size} input units "
+          f"(as counted by input_size){Style.RESET_ALL}\n")
+    # The speedup column needs a real per-line parse to compare against
+    baseline = next((stats.mean for name, _, stats in results if name == "parse"), None)
+    for name, mode, stats in results:
+        per_unit = f"{problem._format_time(stats.mean / size)}/unit" if size else "-"
+        line = (f"  {name:<20} {mode:<6} {problem._format_time(stats.mean):>12} "
+                f"[±{problem._format_time(stats.std_dev)}]  {per_unit:>14}")
+        if baseline is not None:
+            speedup = f"{baseline / stats.mean:.1f}x" if stats.mean > 0 else "-"
+            line += f"  {Fore.MAGENTA}{speedup:>7} vs parse{Style.RESET_ALL}"
+        print(line)
+    if not results:
+        print(f"  {Fore.YELLOW}No parse steps{Style.RESET_ALL}")
+    print()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare each day's bulk parsers against its per-line parse()")
+    parser.add_argument("year", type=int, nargs="?", default=2024)
+    parser.add_argument("--day", type=int, action="append", help="Day to run (repeatable, default: all)")
+    parser.add_argument("--size", type=int, help="Parse a generated input of this size instead of the real one")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    config = TimingConfig(repeat=args.repeat)
+    setup_project_root()
+    for day in args.day or available_days(args.year):
+        with contextlib.redirect_stdout(io.StringIO()):
+            problem: Problem = load_problem_class(args.year, day)(load_example=False)
+        if args.size is not None:
+            try:
+                problem.set_data(problem.generate_input(args.size, args.seed))
+            except NotImplementedError as e:
+                print(f"{Fore.YELLOW}{e}{Style.RESET_ALL}")
+                continue
+        print_benchmark(problem, problem.input_size(), benchmark_parsers(problem, config))
+
+
+if __name__ == "__main__":
+    main()
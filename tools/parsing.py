@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import re
+from array import array
+from typing import List, Optional, Tuple, Union
+
+from tools.lazy import np
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+INT = re.compile(rb"-?\d+")
+UNSIGNED_INT = re.compile(rb"\d+")
+BLANK_LINE = re.compile(rb"\n[ \t\r]*\n")
+
+
+def ints(buffer: Buffer, signed: bool = True) -> array:
+    """Every integer in ``buffer`` as an ``array('q')``, found with a single regex pass over the bytes."""
+    return array('q', map(int, (INT if signed else UNSIGNED_INT).findall(buffer)))
+
+
+def _tokenize(chars: np.ndarray, signed: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """Values and start offsets of the digit runs in ``chars``, without a Python loop over them."""
+    is_digit = (chars >= ord("0")) & (chars <= ord("9"))
+    run_starts, run_ends = is_digit.copy(), is_digit.copy()
+    run_starts[1:] &= ~is_digit[:-1]
+    run_ends[:-1] &= ~is_digit[1:]
+    starts, ends = np.flatnonzero(run_starts), np.flatnonzero(run_ends) + 1
+    if not len(starts):
+        return np.zeros(0, dtype=np.int64), starts
+
+    # Horner's rule one digit place at a time, so the loop runs once per digit of the longest number
+    lengths = ends - starts
+    values = np.zeros(len(starts), dtype=np.int64)
+    for place in range(int(lengths.max())):
+        in_number = lengths > place
+        digits = chars[np.where(in_number, starts + place, 0)].astype(np.int64) - ord("0")
+        values = np.where(in_number, values * 10 + digits, values)
+
+    if signed:
+        negative = (starts > 0) & (chars[np.maximum(starts - 1, 0)] == ord("-"))
+        values[negative] *= -1
+    return values, starts
+
+
+def int_array(buffer: Buffer, signed: bool = True) -> np.ndarray:
+    """Every integer in ``buffer`` as an ``int64`` NumPy array, parsed with whole-array operations."""
+    values, _ = _tokenize(np.frombuffer(buffer, dtype=np.uint8), signed)
+    return values
+
+
+def ragged_ints(buffer: Buffer, signed: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """The integers of each line in CSR layout: row ``i`` is ``values[offsets[i]:offsets[i + 1]]``.
+
+    Every line gets a row, so empty lines show up as empty rows.
+    """
+    chars = np.frombuffer(buffer, dtype=np.uint8)
+    values, starts = _tokenize(chars, signed)
+    if not len(chars):
+        return np.zeros(1, dtype=np.int64), values
+    line_starts = np.flatnonzero(chars == ord("\n")) + 1
+    if chars[-1] == ord("\n"):
+        line_starts = line_starts[:-1]  # No empty row after the final newline
+    offsets = np.searchsorted(starts, np.concatenate([[0], line_starts, [len(chars)]]))
+    return offsets, values
+
+
+def padded(offsets: np.ndarray, values: np.ndarray, fill: int = 0,
+           dtype: Optional[np.dtype] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """CSR rows as one matrix padded with ``fill`` past each row's end, plus the length of each row."""
+    lengths = np.diff(offsets)
+    matrix = np.full((len(lengths), lengths.max(initial=0)), fill, dtype=dtype or values.dtype)
+    # A boolean mask assigns in row-major order, which is the CSR order of the values
+    matrix[np.arange(matrix.shape[1]) < lengths[:, None]] = values
+    return matrix, lengths
+
+
+def intern(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Map ``values`` to dense ids: returns the sorted distinct values and the id of every input value.
+
+    Small non-negative values are interned with a presence table in linear time, anything else with ``np.unique``.
+    """
+    if len(values) and values.min() >= 0 and values.max() < 1 << 24:
+        present = np.zeros(int(values.max()) + 1, dtype=bool)
+        present[values] = True
+        ids = np.cumsum(present) - 1
+        return np.flatnonzero(present), ids[values]
+    distinct, ids = np.unique(values, return_inverse=True)
+    return distinct, ids.reshape(-1)
+
+
+def sections(buffer: Buffer) -> List[memoryview]:
+    """Zero-copy views of the blank-line separated sections of ``buffer``."""
+    view = memoryview(buffer)
+    bounds = [0]
+    for match in BLANK_LINE.finditer(view):
+        bounds.extend((match.start() + 1, match.end()))
+    bounds.append(len(view))
+    return [view[start:end] for start, end in zip(bounds[::2], bounds[1::2])]
+
+
+def records(buffer: Buffer, delimiter: bytes = b",") -> List[List[bytes]]:
+    """Each non-empty line split on ``delimiter``, for inputs whose fields are not all integers."""
+    return [line.split(delimiter) for line in bytes(buffer).splitlines() if line]
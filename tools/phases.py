@@ -0,0 +1,86 @@
+import contextlib
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, ContextManager, Dict, List, Optional
+
+# Shared by every disabled ``phase`` call, so an uninstrumented run only pays for a method call and two attribute
+# accesses
+NULL_PHASE: ContextManager[None] = contextlib.nullcontext()
+
+
+@dataclass
+class PhaseStats:
+    name: str  # nested phases are joined with "/", e.g. "reorder/sort"
+    calls: int  # times the phase was entered per run
+    mean: float  # milliseconds spent in the phase per run
+    share: float = 0.0  # fraction of the whole run
+
+    @property
+    def depth(self) -> int:
+        return self.name.count("/")
+
+
+class _Phase:
+    __slots__ = ("recorder", "name", "start")
+
+    def __init__(self, recorder: "PhaseRecorder", name: str) -> None:
+        self.recorder = recorder
+        self.name = name
+        self.start = 0
+
+    def __enter__(self) -> None:
+        recorder = self.recorder
+        key = f"{recorder.stack[-1]}/{self.name}" if recorder.stack else self.name
+        recorder.stack.append(key)
+        if key not in recorder.totals:
+            # Inserted on entry, so the dicts keep phases in the order they were first entered
+            recorder.totals[key] = recorder.calls[key] = 0
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc: Any) -> None:
+        elapsed = time.perf_counter_ns() - self.start
+        recorder = self.recorder
+        key = recorder.stack.pop()
+        recorder.totals[key] += elapsed
+        recorder.calls[key] += 1
+
+
+class PhaseRecorder:
+    """Accumulates the time spent in named, possibly nested, phases while ``enabled``.
+
+    ``used`` is set by every ``phase`` call, recording or not, so the ordinary timing runs tell whether an
+    implementation declares phases at all before any run is spent on recording them.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.used = False
+        self.stack: List[str] = []
+        self.totals: Dict[str, int] = {}  # nanoseconds
+        self.calls: Dict[str, int] = {}
+
+    def phase(self, name: str) -> ContextManager[None]:
+        self.used = True
+        return _Phase(self, name) if self.enabled else NULL_PHASE
+
+    def measure(self, func: Callable[[], object], runs: int) -> Optional[List[PhaseStats]]:
+        """Run ``func`` ``runs`` times with recording on; ``None`` when it declares no phases.
+
+        Phases come back in the order they were first entered, with their per-run mean time and their share of
+        the whole run.
+        """
+        self.totals, self.calls, self.stack = {}, {}, []
+        self.enabled = True
+        try:
+            start = time.perf_counter_ns()
+            for _ in range(max(runs, 1)):
+                func()
+            elapsed = time.perf_counter_ns() - start
+        finally:
+            self.enabled = False
+        if not self.totals:
+            return None
+
+        runs = max(runs, 1)
+        return [PhaseStats(name, self.calls[name] // runs, total / runs / 1e6, total / elapsed if elapsed else 0.0)
+                for name, total in self.totals.items()]
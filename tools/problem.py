@@ -1,31 +1,26 @@
 import abc
-import csv
-import time
-import tracemalloc
+import mmap
+import os
 from dataclasses import dataclass
 from datetime import datetime
-from statistics import mean, stdev
-from typing import Callable, Dict, List, Optional, Tuple
+from functools import cached_property
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Protocol, Tuple, TypeVar, cast
 
 from colorama import Fore, Style, init
 
-init()  # Initialize colorama
+from tools.cache import CacheConfig, ParseCache, code_fingerprint, solutions_table
+from tools.memory import MemoryConfig, MemoryStats
+from tools.memory import measure as measure_memory
+from tools.phases import PhaseRecorder, PhaseStats
+from tools.sandbox import SandboxConfig, run_sandboxed
+from tools.timing import TimingConfig, TimingStats, measure
 
+T = TypeVar("T")
+N = TypeVar("N", int, float)
 
-@dataclass
-class TimingStats:
-    mean: float
-    std_dev: float
-    min_time: float
-    max_time: float
-    runs: int
-
-
-@dataclass
-class MemoryStats:
-    peak_memory: int
-    current_memory: int
-    memory_blocks: int
+# How the input is materialized: a list of rstripped lines, the raw bytes, a zero-copy mmap view of the file, or a
+# lazy line iterator that never holds the whole file
+LOAD_MODES = ("lines", "bytes", "mmap", "iter")
 
 
 @dataclass
@@ -35,6 +30,10 @@ class Implementation:
     enabled: bool = True
     timing_stats: Optional[TimingStats] = None
     memory_stats: Optional[MemoryStats] = None
+    parser: Optional[Callable[[], Any]] = None
+    data_mode: str = "lines"
+    timeout: Optional[float] = None
+    memory_limit: Optional[int] = None
 
 
 @dataclass
@@ -44,70 +43,266 @@ class RunResult:
     timing_stats: TimingStats
     memory_stats: MemoryStats
     passed: bool
+    parse_stats: Optional[TimingStats] = None
+    status: str = ""  # PASS or FAIL once measured, TIMEOUT or OOM when the sandbox stopped it
+    detail: str = ""
+    phase_stats: Optional[List[PhaseStats]] = None  # only for implementations that declare phases
+    cold_time: Optional[float] = None  # ms, first call in a fresh interpreter, only measured in isolated runs
+    cpu: Optional[int] = None  # core an isolated run was pinned to
+
+    def __post_init__(self) -> None:
+        if not self.status:
+            self.status = "PASS" if self.passed else "FAIL"
+
+    @property
+    def measured(self) -> bool:
+        return self.status in ("PASS", "FAIL")
+
+    @classmethod
+    def aborted(cls, name: str, status: str, detail: str) -> "RunResult":
+        """A run that was stopped before producing a result, with empty measurements."""
+        return cls(name, 0, TimingStats(0.0, 0.0, 0.0, 0.0, 0), MemoryStats(0, 0), False, status=status,
+                   detail=detail)
+
+
+class StreamEngine(Protocol):
+    """Incremental solver fed one input line at a time, keeping the answers up to date."""
+
+    def feed(self, line: str) -> None: ...
+
+    def totals(self) -> Dict[int, int]: ...
+
+
+_colorama_initialized = False
+
+
+def _init_colorama() -> None:
+    """Initialize colorama on first use instead of at import time."""
+    global _colorama_initialized
+    if not _colorama_initialized:
+        init()
+        _colorama_initialized = True
+
+
+def _tightest(*limits: Optional[N]) -> Optional[N]:
+    """The smallest of the limits that are set, ``None`` when none is."""
+    return min((limit for limit in limits if limit is not None), default=None)
 
 
 class Problem(abc.ABC):
+    timing_config: TimingConfig = TimingConfig()
+    memory_config: MemoryConfig = MemoryConfig()
+    load_mode: str = "lines"  # representation loaded eagerly; the others are loaded on first access
+    sandbox_config: SandboxConfig = SandboxConfig()
+    cache_config: CacheConfig = CacheConfig()
+
     def __init__(self, year: int, day: int, name: str, load_example: bool = False) -> None:
         self.year: int = year
         self.day: int = day
         self.name: str = name
-        self.data: List[str] = []
+        self._raw: Optional[bytes] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._buffer: Optional[memoryview] = None
         self.solutions: Dict[str, int] = {}
         self.implementations: Dict[int, Dict[str, Implementation]] = {1: {}, 2: {}}
+        self._parsed: Dict[str, Any] = {}
+        self._parse_stats: Dict[str, TimingStats] = {}
+        self._phases = PhaseRecorder()
+        self._load_example: bool = load_example
+        self.data_path: Optional[str] = None
 
+        _init_colorama()
         print(f"{Fore.CYAN}Initializing <<{self.name}>> (Year {self.year}, Day {self.day}){Style.RESET_ALL}")
         self._load_data(load_example)
         self._load_solutions(load_example)
 
-    def register_implementation(self, part: int, name: str, func: Callable[[], int], enabled: bool = True) -> None:
+    def register_implementation(self, part: int, name: str, func: Callable[[], int], enabled: bool = True,
+                                parser: Optional[Callable[[], Any]] = None, data_mode: str = "lines",
+                                timeout: Optional[float] = None, memory_limit: Optional[int] = None) -> None:
+        """Register ``func`` as a solution for ``part``.
+
+        ``parser`` is the parse step the implementation reads through ``parsed_with``; it defaults to ``parse``.
+        The harness times it separately and warms its cache so the solve timings exclude parsing.
+        ``data_mode`` is the input representation the implementation reads (see ``LOAD_MODES``), loaded before
+        any measurement.
+        ``timeout`` (seconds) and ``memory_limit`` (bytes) cap ``sandbox_config`` for this implementation, the
+        smaller limit winning; they are only enforced when the sandbox is enabled.
+        """
         if part not in (1, 2):
             raise ValueError("Part must be 1 or 2")
-        self.implementations[part][name] = Implementation(name, func, enabled)
+        if data_mode not in LOAD_MODES:
+            raise ValueError(f"Data mode must be one of {', '.join(LOAD_MODES)}")
+        self.implementations[part][name] = Implementation(name, func, enabled, parser=parser, data_mode=data_mode,
+                                                          timeout=timeout, memory_limit=memory_limit)
+
+    def phase(self, name: str) -> ContextManager[None]:
+        """Time a section of an implementation: ``with self.phase("parse"): ...``. Phases can nest.
+
+        Recording is off while the harness times the implementation, so a phase then costs a method call; the
+        breakdown comes from separate instrumented runs.
+        """
+        return self._phases.phase(name)
+
+    @cached_property
+    def data(self) -> List[str]:
+        """Input as a list of rstripped lines.
+
+        Cached in the instance dict on first access, so the hot ``self.data[row][col]`` lookups in the solutions
+        cost a plain attribute read rather than a property call.
+        """
+        return list(self.iter_lines())
+
+    @property
+    def raw(self) -> bytes:
+        """Input as a single bytes object, read in one go without splitting into lines."""
+        if self._raw is None:
+            if self.data_path is not None:
+                with open(self.data_path, "rb") as file:
+                    self._raw = file.read()
+            else:
+                self._raw = "".join(f"{line}\n" for line in self.data).encode()
+        return self._raw
+
+    @property
+    def buffer(self) -> memoryview:
+        """Read-only zero-copy view of the input file. Generated inputs fall back to a view of ``raw``."""
+        if self._buffer is None:
+            if self.data_path is not None and os.path.getsize(self.data_path) > 0:
+                with open(self.data_path, "rb") as file:
+                    self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._buffer = memoryview(self._mmap)
+            else:
+                self._buffer = memoryview(self.raw)
+        return self._buffer
+
+    def iter_lines(self) -> Iterator[str]:
+        """Lazily yield rstripped lines without keeping the whole input in memory."""
+        if "data" in self.__dict__:
+            yield from self.data
+        elif self.data_path is not None:
+            with open(self.data_path) as file:
+                for line in file:
+                    yield line.rstrip()
+
+    def load(self, mode: str) -> None:
+        """Materialize the representation used by ``mode`` so later accesses are free."""
+        if mode == "lines":
+            self.data
+        elif mode == "bytes":
+            self.raw
+        elif mode == "mmap":
+            self.buffer
+
+    def _drop_input(self) -> None:
+        self.__dict__.pop("data", None)
+        self._raw = None
+        if self._buffer is not None:
+            try:
+                self._buffer.release()
+                if self._mmap is not None:
+                    self._mmap.close()
+            except BufferError:
+                pass  # Still exported, e.g. by a NumPy view; the map is closed once that is collected
+        self._buffer = None
+        self._mmap = None
+
+    def parse(self) -> Any:
+        """Turn ``self.data`` into the structure the implementations work on. Override in subclasses."""
+        return self.data
+
+    @property
+    def parsed(self) -> Any:
+        """Result of ``parse``, computed once per loaded input."""
+        return self.parsed_with(self.parse)
+
+    def parsed_with(self, parser: Callable[[], T]) -> T:
+        """Memoized result of an alternative parse step, for implementations that need another representation.
+
+        With ``cache_config`` enabled the result also persists on disk across runs, see ``tools.cache``.
+        """
+        key = parser.__name__
+        if key not in self._parsed:
+            cache = self.parse_cache
+            if cache is None or self.data_path is None or getattr(parser, "__func__", None) is Problem.parse:
+                self._parsed[key] = parser()
+            else:
+                self._parsed[key] = cache.fetch(self._cache_key(parser), self.data_path, parser)
+        return cast(T, self._parsed[key])
+
+    @property
+    def parse_cache(self) -> Optional[ParseCache]:
+        return ParseCache.for_year(self.year, self.cache_config) if self.cache_config.enabled else None
+
+    def _cache_key(self, parser: Callable[[], Any], kind: str = "parsed") -> str:
+        example = "-intro" if self._load_example else ""
+        return f"day{self.day}{example}-{parser.__name__}-{kind}-{code_fingerprint(parser)}"
+
+    def invalidate_parsed(self) -> None:
+        self._parsed.clear()
+        self._parse_stats.clear()
+
+    def set_data(self, lines: List[str]) -> None:
+        """Replace the input, e.g. with generated data, dropping anything parsed from the previous one."""
+        self.invalidate_parsed()
+        self._drop_input()
+        self.data_path = None
+        self.data = lines
+
+    def input_size(self) -> int:
+        """Size of the current input in the units ``generate_input`` understands."""
+        return len(self.data)
+
+    def generate_input(self, size: int, seed: int = 0) -> List[str]:
+        """Produce a synthetic input of roughly ``size`` units in the same format as the data file."""
+        raise NotImplementedError(f"Day {self.day} has no input generator")
+
+    def stream_engine(self) -> StreamEngine:
+        """A fresh incremental engine for this day, used by ``tools.throughput``."""
+        raise NotImplementedError(f"Day {self.day} has no streaming engine")
+
+    def reload_data(self, load_example: Optional[bool] = None) -> None:
+        if load_example is not None:
+            self._load_example = load_example
+        self._load_data(self._load_example)
+        self._load_solutions(self._load_example)
 
     def _load_data(self, load_example: bool) -> None:
+        self.invalidate_parsed()
+        self._drop_input()
+        self.data_path = None
         file_path = f'{self.year}/data/day{self.day}{"-intro" if load_example else ""}'
         try:
-            with open(file_path) as file:
-                self.data = [line.rstrip() for line in file]
-            print(f"{Fore.GREEN}✓ Loaded data from {file_path}{Style.RESET_ALL}")
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(file_path)
+            self.data_path = file_path
+            self.load(self.load_mode)
+            print(f"{Fore.GREEN}✓ Loaded data from {file_path} ({self.load_mode}){Style.RESET_ALL}")
         except FileNotFoundError:
             print(f"{Fore.RED}✗ Error: File {file_path} not found.{Style.RESET_ALL}")
             self.data = []
         except Exception as e:
             print(f"{Fore.RED}✗ Error loading data: {e}{Style.RESET_ALL}")
+            self.data_path = None
             self.data = []
 
     def _load_solutions(self, load_example: bool) -> None:
         file_path = f'{self.year}/solutions.csv'
         try:
-            with open(file_path, mode='r') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    if int(row["day"]) == self.day:
-                        self.solutions = {
-                            'part_1': int(row['part_1_sample']) if load_example else int(row['part_1_solution']),
-                            'part_2': int(row['part_2_sample']) if load_example else int(row['part_2_solution']),
-                        }
-                        print(f"{Fore.GREEN}✓ Loaded solutions from {file_path}{Style.RESET_ALL}")
-                        break
+            row = solutions_table(file_path, self.parse_cache).get(self.day)
+            if row is not None:
+                self.solutions = {
+                    'part_1': int(row['part_1_sample']) if load_example else int(row['part_1_solution']),
+                    'part_2': int(row['part_2_sample']) if load_example else int(row['part_2_solution']),
+                }
+                print(f"{Fore.GREEN}✓ Loaded solutions from {file_path}{Style.RESET_ALL}")
         except FileNotFoundError:
             print(f"{Fore.RED}✗ Error: File {file_path} not found.{Style.RESET_ALL}")
         except Exception as e:
             print(f"{Fore.RED}✗ Error loading solutions: {e}{Style.RESET_ALL}")
 
-    def _measure_memory(self, func: Callable[[], int]) -> Tuple[int, MemoryStats]:
-        tracemalloc.start()
-        result = func()
-        snapshot = tracemalloc.take_snapshot()
-        stats = snapshot.statistics('lineno')
-        current, peak = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
-
-        return result, MemoryStats(
-            peak_memory=peak,
-            current_memory=current,
-            memory_blocks=len(stats)
-        )
+    def _measure_memory(self, func: Callable[[], int], config: Optional[MemoryConfig] = None) -> \
+            Tuple[int, MemoryStats]:
+        return measure_memory(func, config or self.memory_config)
 
     def _format_memory(self, bytes: int) -> str:
         if bytes >= 1_000_000_000:
@@ -119,21 +314,24 @@ class Problem(abc.ABC):
         else:
             return f"{bytes} B"
 
-    def _measure_performance(self, func: Callable[[], int], runs: int = 5) -> TimingStats:
-        timings = []
-        for _ in range(runs):
-            start_time = time.perf_counter_ns()
-            func()
-            elapsed = time.perf_counter_ns()
-            timings.append((elapsed - start_time) / 1e6)  # Convert to milliseconds
-
-        return TimingStats(
-            mean=mean(timings),
-            std_dev=stdev(timings) if len(timings) > 1 else 0,
-            min_time=min(timings),
-            max_time=max(timings),
-            runs=runs
-        )
+    def _measure_performance(self, func: Callable[[], int], config: Optional[TimingConfig] = None) -> TimingStats:
+        return measure(func, config or self.timing_config)
+
+    def _measure_parse(self, parser: Callable[[], Any]) -> Optional[TimingStats]:
+        if getattr(parser, "__func__", None) is Problem.parse:
+            return None
+
+        key = parser.__name__
+        if key not in self._parse_stats:
+            cache = self.parse_cache
+            if cache is None or self.data_path is None:
+                self._parse_stats[key] = self._measure_performance(parser)
+            else:
+                # Warm runs reuse the timing recorded with the cached value instead of parsing again
+                self._parse_stats[key] = cache.fetch(self._cache_key(parser, "timing"), self.data_path,
+                                                     lambda: self._measure_performance(parser))
+        self.parsed_with(parser)
+        return self._parse_stats[key]
 
     def _format_time(self, ms: float) -> str:
         if ms >= 1000:
@@ -152,6 +350,11 @@ class Problem(abc.ABC):
 
         indicators = {result.name: [] for result in results}
 
+        # Badges need something to compare against; a lone result (e.g. one task per implementation) gets none
+        results = [result for result in results if result.measured]
+        if len(results) < 2:
+            return indicators
+
         # Find fastest implementation
         fastest = min(results, key=lambda x: x.timing_stats.mean)
         indicators[fastest.name].append(f"{Fore.YELLOW}⚡ FASTEST{Style.RESET_ALL}")
@@ -168,35 +371,75 @@ class Problem(abc.ABC):
             print(f"{Fore.YELLOW}Part {part} - {name}: SKIPPED{Style.RESET_ALL}")
             return None
 
-        try:
-            # Measure memory first in isolation
-            result, memory_stats = self._measure_memory(impl.func)
-            # Then measure timing
-            timing_stats = self._measure_performance(impl.func)
-
-            passed = solution is None or result == solution
-            return RunResult(name, result, timing_stats, memory_stats, passed)
+        if self.sandbox_config.enabled:
+            return self._run_sandboxed(part, name, impl, solution)
 
+        try:
+            return self._measure_implementation(part, name, impl, solution)
         except Exception as e:
             print(f"{Fore.RED}Part {part} - {name}: ✗ Error occurred: {e}{Style.RESET_ALL}\n")
             return None
 
+    def _run_sandboxed(self, part: int, name: str, impl: Implementation, solution: Optional[int] = None) -> \
+    Optional[RunResult]:
+        timeout = _tightest(self.sandbox_config.timeout, impl.timeout)
+        memory_limit = _tightest(self.sandbox_config.memory_limit, impl.memory_limit)
+        status, result, detail = run_sandboxed(self, part, name, impl, solution, timeout, memory_limit,
+                                               self.sandbox_config.isolate, self.sandbox_config.cpu)
+        if status == "OK":
+            return cast(RunResult, result)
+        if status == "ERROR":
+            print(f"{Fore.RED}Part {part} - {name}: ✗ Error occurred: {detail}{Style.RESET_ALL}\n")
+            return None
+        return RunResult.aborted(name, status, detail)
+
+    def _measure_implementation(self, part: int, name: str, impl: Implementation,
+                                solution: Optional[int] = None) -> RunResult:
+        # Load and parse once up front so the measurements below only see the solve step
+        self.load(impl.data_mode)
+        parse_stats = self._measure_parse(impl.parser or self.parse)
+        self._phases.used = False
+        # Measure memory first in isolation
+        result, memory_stats = self._measure_memory(impl.func)
+        # Then measure timing
+        timing_stats = self._measure_performance(impl.func)
+        # And finally where that time goes, if the runs above entered any phase
+        phase_stats = self._phases.measure(impl.func, self.timing_config.repeat) if self._phases.used else None
+
+        passed = solution is None or result == solution
+        return RunResult(name, result, timing_stats, memory_stats, passed, parse_stats, phase_stats=phase_stats)
+
     def _print_results(self, part: int, results: List[RunResult], indicators: Dict[str, List[str]],
                        solution: Optional[int] = None) -> None:
         for run in results:
+            if not run.measured:
+                icon = "⌛" if run.status == "TIMEOUT" else "✗"
+                print(f"{Fore.RED}Part {part} - {run.name}: {icon} {run.status} ({run.detail}){Style.RESET_ALL}\n")
+                continue
+
+            timing = run.timing_stats
             timing_info = (
-                f"avg: {self._format_time(run.timing_stats.mean)} "
-                f"[±{self._format_time(run.timing_stats.std_dev)}] "
-                f"(min: {self._format_time(run.timing_stats.min_time)}, "
-                f"max: {self._format_time(run.timing_stats.max_time)}, "
-                f"runs: {run.timing_stats.runs})"
+                f"avg: {self._format_time(timing.mean)} "
+                f"[±{self._format_time(timing.std_dev)}] "
+                f"(min: {self._format_time(timing.min_time)}, "
+                f"max: {self._format_time(timing.max_time)}, "
+                f"runs: {timing.runs}×{timing.loops})"
+            )
+            percentile_info = (
+                f"p50: {self._format_time(timing.p50)} "
+                f"p95: {self._format_time(timing.p95)} "
+                f"p99: {self._format_time(timing.p99)} "
+                f"CI: [{self._format_time(timing.ci_low)}, {self._format_time(timing.ci_high)}]"
             )
 
+            memory = run.memory_stats
             memory_info = (
-                f"peak: {self._format_memory(run.memory_stats.peak_memory)} "
-                f"final: {self._format_memory(run.memory_stats.current_memory)} "
-                f"blocks: {run.memory_stats.memory_blocks}"
+                f"peak: {self._format_memory(memory.peak_memory)} "
+                f"final: {self._format_memory(memory.current_memory)} "
+                f"({memory.mode})"
             )
+            if memory.mode == "deep":
+                memory_info += f" blocks: {memory.memory_blocks}"
 
             status = f"{Fore.GREEN}✓ PASS{Style.RESET_ALL}" if run.passed else f"{Fore.RED}✗ FAIL{Style.RESET_ALL}"
             perf_indicators = ' '.join(indicators.get(run.name, []))
@@ -208,9 +451,31 @@ class Problem(abc.ABC):
 
             print(result_str)
             print(f"{Fore.CYAN}  ⧗ {timing_info}{Style.RESET_ALL}")
-            print(f"{Fore.MAGENTA}  📊 {memory_info}{Style.RESET_ALL}\n")
-
-    def check_solutions(self, implementation_name: Optional[str] = None) -> None:
+            print(f"{Fore.CYAN}    {percentile_info}{Style.RESET_ALL}")
+            if run.cold_time is not None:
+                pinned = f" on CPU {run.cpu}" if run.cpu is not None else ""
+                print(f"{Fore.CYAN}    cold: {self._format_time(run.cold_time)} warm: {self._format_time(timing.mean)} "
+                      f"({run.cold_time / timing.mean if timing.mean else 0:.1f}x){pinned}{Style.RESET_ALL}")
+            if run.parse_stats is not None:
+                split_info = (
+                    f"parse: {self._format_time(run.parse_stats.mean)} "
+                    f"solve: {self._format_time(timing.mean)} "
+                    f"total: {self._format_time(run.parse_stats.mean + timing.mean)}"
+                )
+                print(f"{Fore.CYAN}    {split_info}{Style.RESET_ALL}")
+            for phase in run.phase_stats or []:
+                label = "  " * phase.depth + phase.name.rsplit("/", 1)[-1]
+                print(f"{Fore.CYAN}    ▸ {label:<24} {self._format_time(phase.mean):>12} {phase.share:>6.1%}"
+                      f"{f'  ×{phase.calls}' if phase.calls > 1 else ''}{Style.RESET_ALL}")
+            print(f"{Fore.MAGENTA}  📊 {memory_info}{Style.RESET_ALL}")
+            for site in memory.top_sites:
+                print(f"{Fore.MAGENTA}    {self._format_memory(site.size_diff):>10} "
+                      f"{site.count_diff:>8} blocks  {site.location}{Style.RESET_ALL}")
+            print()
+
+    def check_solutions(self, implementation_name: Optional[str] = None,
+                        only_part: Optional[int] = None) -> Dict[int, List[RunResult]]:
+        all_results: Dict[int, List[RunResult]] = {}
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         print(f"\n{Fore.CYAN}={'=' * 80}{Style.RESET_ALL}")
         print(f"{Fore.CYAN}Running solutions for Day {self.day}: <<{self.name}>> at {timestamp}{Style.RESET_ALL}")
@@ -219,7 +484,7 @@ class Problem(abc.ABC):
         if not self.solutions and implementation_name is not None:
             print(f"{Fore.YELLOW}No solutions available, running without verification.{Style.RESET_ALL}\n")
 
-        for part in (1, 2):
+        for part in (1, 2) if only_part is None else (only_part,):
             solution = self.solutions.get(f'part_{part}') if self.solutions else None
             implementations = self.implementations[part]
 
@@ -232,6 +497,7 @@ class Problem(abc.ABC):
                     result = self._run_implementation(part, implementation_name,
                                                       implementations[implementation_name], solution)
                     if result:
+                        all_results[part] = [result]
                         self._print_results(part, [result], self._get_performance_indicators([result]), solution)
                 else:
                     print(
@@ -243,7 +509,9 @@ class Problem(abc.ABC):
                     if result:
                         results.append(result)
 
+                all_results[part] = results
                 indicators = self._get_performance_indicators(results)
                 self._print_results(part, results, indicators, solution)
 
         print(f"{Fore.CYAN}={'=' * 80}{Style.RESET_ALL}\n")
+        return all_results
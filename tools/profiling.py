@@ -0,0 +1,224 @@
+import cProfile
+import marshal
+import os
+import pstats
+import re
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from colorama import Fore, Style
+
+from tools.problem import Implementation, Problem
+
+PROFILERS = ("cprofile", "sample")
+
+FunctionKey = Tuple[str, int, str]  # pstats convention: (filename, first line, function name)
+Stack = Tuple[FunctionKey, ...]  # root first
+
+
+@dataclass
+class ProfileReport:
+    part: int
+    name: str
+    profiler: str
+    calls: int
+    samples: int
+    pstats_path: Path
+    collapsed_path: Path
+    hot_functions: List[Tuple[FunctionKey, float, float]]  # (function, self ms, cumulative ms)
+
+
+def _repeat(func: Callable[[], Any], duration: float) -> int:
+    """Call ``func`` until ``duration`` seconds have passed, at least once, and return the number of calls."""
+    calls = 0
+    deadline = time.perf_counter() + duration
+    while calls == 0 or time.perf_counter() < deadline:
+        func()
+        calls += 1
+    return calls
+
+
+_REPEAT_CODE: CodeType = _repeat.__code__
+
+
+def _frame_key(code: CodeType) -> FunctionKey:
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+def _stack_of(frame: Optional[FrameType]) -> Stack:
+    """Stack from the implementation down to ``frame``, leaving out the profiler and harness frames."""
+    stack = []
+    while frame is not None and frame.f_code is not _REPEAT_CODE:
+        stack.append(_frame_key(frame.f_code))
+        frame = frame.f_back
+    if frame is None:
+        return ()  # Not inside the profiled call
+    return tuple(reversed(stack))
+
+
+class Sampler:
+    """Statistical profiler that records the Python stack every ``interval`` seconds of CPU time.
+
+    Uses ``SIGPROF`` where available, which adds almost no overhead between samples. Elsewhere, or off the main
+    thread, a background thread polls the profiled thread's frame instead.
+    """
+
+    def __init__(self, interval: float = 0.001) -> None:
+        self.interval = interval
+        self.stacks: Counter[Stack] = Counter()
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._poller: Optional[threading.Thread] = None
+        self._use_signal = hasattr(signal, "SIGPROF") and threading.current_thread() is threading.main_thread()
+
+    def _record(self, frame: Optional[FrameType]) -> None:
+        stack = _stack_of(frame)
+        if stack:
+            self.stacks[stack] += 1
+
+    def _on_signal(self, signum: int, frame: Optional[FrameType]) -> None:
+        self._record(frame)
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._record(sys._current_frames().get(self._thread_id))
+
+    def __enter__(self) -> "Sampler":
+        if self._use_signal:
+            self._previous_handler = signal.signal(signal.SIGPROF, self._on_signal)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        else:
+            self._poller = threading.Thread(target=self._poll, daemon=True)
+            self._poller.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._use_signal:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler)
+        else:
+            self._stop.set()
+            if self._poller is not None:
+                self._poller.join()
+
+    def to_pstats(self) -> Dict[FunctionKey, Tuple[int, int, float, float, Dict[FunctionKey, Tuple]]]:
+        """Sample counts in the marshalled ``pstats`` layout; "calls" are the number of samples seen in."""
+        stats: Dict[FunctionKey, List[Any]] = {}
+        for stack, count in self.stacks.items():
+            seconds = count * self.interval
+            for depth, function in enumerate(stack):
+                entry = stats.setdefault(function, [0, 0, 0.0, 0.0, {}])
+                if function not in stack[:depth]:  # Count recursion once for the cumulative time
+                    entry[0] += count
+                    entry[1] += count
+                    entry[3] += seconds
+                if depth == len(stack) - 1:
+                    entry[2] += seconds
+                if depth > 0:
+                    caller = stack[depth - 1]
+                    nc, cc, tt, ct = entry[4].get(caller, (0, 0, 0.0, 0.0))
+                    entry[4][caller] = (nc + count, cc + count, tt, ct + seconds)
+        return {function: (nc, cc, tt, ct, callers) for function, (nc, cc, tt, ct, callers) in stats.items()}
+
+
+def _short_name(function: FunctionKey) -> str:
+    filename, line, name = function
+    if filename == "~":  # Builtins as reported by cProfile
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def write_collapsed(stacks: Counter, path: Path) -> None:
+    """Write stacks in the collapsed format read by flamegraph.pl and speedscope."""
+    with open(path, "w") as file:
+        for stack, count in sorted(stacks.items()):
+            frames = ";".join(_short_name(function).replace(";", ":") for function in stack)
+            file.write(f"{frames} {count}\n")
+
+
+def hot_functions(path: Path, top: int) -> List[Tuple[FunctionKey, float, float]]:
+    # Raw table behind print_stats(); typeshed leaves it out of the stubs
+    stats: Dict[FunctionKey, Tuple[int, int, float, float, Dict]] = getattr(pstats.Stats(str(path)), "stats")
+    ranked = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)
+    return [(function, tt * 1e3, ct * 1e3) for function, (_, _, tt, ct, _) in ranked[:top]]
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def profile_implementation(problem: Problem, part: int, impl: Implementation, out_dir: Path,
+                           profiler: str = "cprofile", duration: float = 1.0, interval: float = 0.001,
+                           top: int = 10) -> ProfileReport:
+    """Profile one implementation and write ``<stem>.pstats`` and ``<stem>.folded`` to ``out_dir``.
+
+    The cProfile mode is exact but slows down Python-heavy code; its collapsed stacks still come from a separate
+    sampled run, since cProfile does not keep full stacks. The sample mode only runs the sampler and derives the
+    ``.pstats`` file from the samples.
+    """
+    if profiler not in PROFILERS:
+        raise ValueError(f"Profiler must be one of {', '.join(PROFILERS)}")
+
+    problem.load(impl.data_mode)
+    problem.parsed_with(impl.parser or problem.parse)
+    # Warm up first, so deferred imports and cold caches stay out of the profiles
+    impl.func()
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = out_dir / f"day{problem.day}-part{part}-{_slug(impl.name)}"
+    pstats_path, collapsed_path = stem.with_suffix(".pstats"), stem.with_suffix(".folded")
+
+    sampler = Sampler(interval)
+    with sampler:
+        calls = _repeat(impl.func, duration)
+    write_collapsed(sampler.stacks, collapsed_path)
+
+    if profiler == "cprofile":
+        profile = cProfile.Profile()
+        profile.enable()
+        calls = _repeat(impl.func, duration)
+        profile.disable()
+        profile.dump_stats(str(pstats_path))
+    else:
+        with open(pstats_path, "wb") as file:
+            marshal.dump(sampler.to_pstats(), file)
+
+    return ProfileReport(part, impl.name, profiler, calls, sum(sampler.stacks.values()), pstats_path,
+                         collapsed_path, hot_functions(pstats_path, top))
+
+
+def print_report(problem: Problem, report: ProfileReport) -> None:
+    print(f"Part {report.part} - {report.name}: {report.profiler}, {report.calls} calls, {report.samples} samples")
+    print(f"{Fore.CYAN}  → {report.pstats_path}\n  → {report.collapsed_path}{Style.RESET_ALL}")
+    for function, self_ms, cumulative_ms in report.hot_functions:
+        print(f"{Fore.MAGENTA}  {problem._format_time(self_ms / report.calls):>12} self "
+              f"{problem._format_time(cumulative_ms / report.calls):>12} cum  {_short_name(function)}{Style.RESET_ALL}")
+    print()
+
+
+def profile_problem(problem: Problem, out_dir: Path, profiler: str = "cprofile",
+                    implementation_name: Optional[str] = None, only_part: Optional[int] = None,
+                    duration: float = 1.0, top: int = 10) -> List[ProfileReport]:
+    print(f"\n{Fore.CYAN}Profiling Day {problem.day}: <<{problem.name}>> (per-call times){Style.RESET_ALL}\n")
+    reports = []
+    for part, implementations in problem.implementations.items():
+        if only_part is not None and part != only_part:
+            continue
+        for name, impl in implementations.items():
+            if not impl.enabled or (implementation_name is not None and name != implementation_name):
+                continue
+            try:
+                report = profile_implementation(problem, part, impl, out_dir, profiler, duration, top=top)
+            except Exception as e:
+                print(f"{Fore.RED}Part {part} - {name}: ✗ Error occurred: {e}{Style.RESET_ALL}\n")
+                continue
+            print_report(problem, report)
+            reports.append(report)
+    return reports
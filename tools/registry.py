@@ -0,0 +1,94 @@
+import ast
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class ImplementationInfo:
+    part: int
+    name: str
+    method: Optional[str]
+    data_mode: str = "lines"
+
+
+@dataclass
+class DayInfo:
+    year: int
+    day: int
+    path: Path
+    class_name: str
+    title: Optional[str] = None
+    imports: List[str] = field(default_factory=list)
+    implementations: List[ImplementationInfo] = field(default_factory=list)
+
+    @property
+    def module(self) -> str:
+        return f"{self.year}.solutions.day{self.day}"
+
+    def implementation_names(self, part: int) -> List[str]:
+        return [impl.name for impl in self.implementations if impl.part == part]
+
+
+def _constant(node: Optional[ast.expr]) -> object:
+    return node.value if isinstance(node, ast.Constant) else None
+
+
+def _scan_registrations(class_node: ast.ClassDef) -> List[ImplementationInfo]:
+    implementations = []
+    for node in ast.walk(class_node):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr == "register_implementation" and len(node.args) >= 3):
+            continue
+        part, name = _constant(node.args[0]), _constant(node.args[1])
+        if not isinstance(part, int) or not isinstance(name, str):
+            continue  # Registered dynamically, only known once imported
+        method = node.args[2].attr if isinstance(node.args[2], ast.Attribute) else None
+        data_mode = next((_constant(kw.value) for kw in node.keywords if kw.arg == "data_mode"), "lines")
+        implementations.append(ImplementationInfo(part, name, method, str(data_mode)))
+    return implementations
+
+
+def _scan_title(class_node: ast.ClassDef) -> Optional[str]:
+    for node in ast.walk(class_node):
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "__init__"
+                and len(node.args) >= 3):
+            title = _constant(node.args[2])
+            if isinstance(title, str):
+                return title
+    return None
+
+
+def scan_day(year: int, day: int, path: Path) -> Optional[DayInfo]:
+    """Describe a solution module from its source, without importing it."""
+    tree = ast.parse(path.read_text(), filename=str(path))
+    class_name = f"Day{day}"
+    class_node = next((node for node in tree.body if isinstance(node, ast.ClassDef) and node.name == class_name),
+                      None)
+    if class_node is None:
+        return None
+
+    imports: List[str] = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            imports.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            imports.append(node.module)
+
+    return DayInfo(year, day, path, class_name, _scan_title(class_node), imports, _scan_registrations(class_node))
+
+
+def discover(year: int) -> Dict[int, DayInfo]:
+    """All ``dayN.py`` solutions of a year, keyed by day."""
+    days = {}
+    for path in (PROJECT_ROOT / str(year) / "solutions").glob("day*.py"):
+        match = re.fullmatch(r"day(\d+)\.py", path.name)
+        if match is None:
+            continue
+        info = scan_day(year, int(match.group(1)), path)
+        if info is not None:
+            days[info.day] = info
+    return dict(sorted(days.items()))
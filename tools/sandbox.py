@@ -0,0 +1,198 @@
+import contextlib
+import dataclasses
+import io
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
+
+from tools import parallel
+from tools.lazy import load_deferred
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+
+    from tools.cache import CacheConfig
+    from tools.memory import MemoryConfig
+    from tools.problem import Implementation, Problem
+    from tools.timing import TimingConfig
+
+
+@dataclasses.dataclass
+class SandboxConfig:
+    enabled: bool = False
+    timeout: Optional[float] = None  # seconds of wall-clock time for the whole measurement of one implementation
+    memory_limit: Optional[int] = None  # bytes the implementation may map on top of the child's starting footprint
+    isolate: bool = False  # measure in a freshly spawned interpreter instead of a fork of the current one
+    cpu: Optional[int] = None  # core the isolated child is pinned to, default: the last one available
+
+
+@dataclasses.dataclass
+class IsolatedSpec:
+    """Everything a spawned child needs to rebuild the problem from scratch."""
+    year: int
+    day: int
+    load_example: bool
+    load_mode: str
+    timing: "TimingConfig"
+    memory: "MemoryConfig"
+    cache: "CacheConfig"
+    lines: Optional[List[str]] = None  # generated input, for problems not reading their data file
+
+
+def isolated_spec(problem: "Problem") -> IsolatedSpec:
+    lines = problem.data if problem.data_path is None else None
+    return IsolatedSpec(problem.year, problem.day, problem._load_example, problem.load_mode, problem.timing_config,
+                        problem.memory_config, problem.cache_config, lines)
+
+
+def pin_to_cpu(cpu: Optional[int]) -> Optional[int]:
+    """Restrict this process to one core and return it, or ``None`` where affinity is not supported."""
+    if not hasattr(os, "sched_setaffinity"):
+        return None
+    if cpu is None:
+        cpu = max(os.sched_getaffinity(0))
+    os.sched_setaffinity(0, {cpu})
+    return cpu
+
+
+def _address_space() -> int:
+    """Current virtual memory size of this process in bytes."""
+    with open("/proc/self/statm") as file:
+        return int(file.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _limit_memory(limit: int) -> None:
+    """Cap the address space at ``limit`` bytes above what is already mapped (the interpreter, input and parse)."""
+    try:
+        ceiling = _address_space() + limit
+    except OSError:
+        ceiling = limit
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        ceiling = min(ceiling, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (ceiling, hard))
+
+
+def _child(problem: "Problem", part: int, name: str, impl: "Implementation", solution: Optional[int],
+           memory_limit: Optional[int], conn: "Connection") -> None:
+    output = io.StringIO()
+    message: Tuple[str, Any, str]
+    with contextlib.redirect_stdout(output):
+        try:
+            # Load and parse before the limit so it only applies to the solve step
+            problem.load(impl.data_mode)
+            problem.parsed_with(impl.parser or problem.parse)
+            # Imports the parser did not trigger would otherwise run under the limit and inside the measurements
+            load_deferred(sys.modules[type(problem).__module__])
+            if memory_limit is not None and resource is not None:
+                _limit_memory(memory_limit)
+            message = ("OK", problem._measure_implementation(part, name, impl, solution), "")
+        except MemoryError:
+            message = ("OOM", None, "")
+        except Exception as e:
+            message = ("ERROR", None, f"{type(e).__name__}: {e}")
+        finally:
+            parallel.shutdown()  # Child processes exit without running atexit handlers
+    conn.send((*message, output.getvalue()))
+    conn.close()
+
+
+def _isolated_child(spec: IsolatedSpec, part: int, name: str, solution: Optional[int], memory_limit: Optional[int],
+                    cpu: Optional[int], conn: "Connection") -> None:
+    output = io.StringIO()
+    message: Tuple[str, Any, str]
+    with contextlib.redirect_stdout(output):
+        try:
+            # Pinned before anything runs, so the imports, parsing and every measurement share one core
+            pinned = pin_to_cpu(cpu)
+            from tools.helpers import RunOptions, create_problem, setup_project_root
+
+            setup_project_root()
+            problem = create_problem(spec.year, spec.day, RunOptions(spec.timing, spec.memory, spec.load_mode,
+                                                                     cache=spec.cache), spec.load_example)
+            if spec.lines is not None:
+                problem.set_data(spec.lines)
+            impl = problem.implementations[part][name]
+            problem.load(impl.data_mode)
+            problem.parsed_with(impl.parser or problem.parse)
+            # Imports the parser did not trigger would otherwise run under the limit and inside the measurements
+            load_deferred(sys.modules[type(problem).__module__])
+            if memory_limit is not None and resource is not None:
+                _limit_memory(memory_limit)
+
+            # Nothing has called the implementation in this interpreter yet, so this is a true first call
+            start = time.perf_counter_ns()
+            result = impl.func()
+            cold_time = (time.perf_counter_ns() - start) / 1e6
+
+            run = problem._measure_implementation(part, name, impl, solution)
+            # Checked against the first call, as in-process runs do, in case the implementation mutates its input
+            passed = solution is None or result == solution
+            message = ("OK", dataclasses.replace(run, result=result, passed=passed, status="", cold_time=cold_time,
+                                                 cpu=pinned), "")
+        except MemoryError:
+            message = ("OOM", None, "")
+        except Exception as e:
+            message = ("ERROR", None, f"{type(e).__name__}: {e}")
+        finally:
+            parallel.shutdown()  # Child processes exit without running atexit handlers
+    conn.send((*message, output.getvalue()))
+    conn.close()
+
+
+def run_sandboxed(problem: "Problem", part: int, name: str, impl: "Implementation", solution: Optional[int],
+                  timeout: Optional[float] = None, memory_limit: Optional[int] = None, isolate: bool = False,
+                  cpu: Optional[int] = None) -> Tuple[str, Any, str]:
+    """Measure one implementation in a forked child process.
+
+    Returns ``(status, result, detail)``: ``OK`` with the child's ``RunResult``, or ``TIMEOUT``, ``OOM`` or
+    ``ERROR`` with ``None``. The child is killed once ``timeout`` seconds have passed; running out of address
+    space, or being killed by the kernel OOM killer, counts as ``OOM``.
+
+    With ``isolate`` the child is a freshly spawned interpreter pinned to ``cpu`` that rebuilds the problem, so it
+    inherits no warm caches or heap from earlier implementations, and the result also carries its first-call time.
+    """
+    if isolate:
+        spawn = multiprocessing.get_context("spawn")
+        receiver, sender = spawn.Pipe(duplex=False)
+        process: multiprocessing.process.BaseProcess = spawn.Process(
+            target=_isolated_child, args=(isolated_spec(problem), part, name, solution, memory_limit, cpu, sender),
+            daemon=True)
+    else:
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("Sandboxed execution needs the 'fork' start method")
+        context = multiprocessing.get_context("fork")
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=_child, args=(problem, part, name, impl, solution, memory_limit, sender),
+                                  daemon=True)
+    process.start()
+    sender.close()
+
+    try:
+        if not receiver.poll(timeout):
+            process.kill()
+            process.join()
+            return "TIMEOUT", None, f"over {timeout:g}s"
+        status, result, detail, output = receiver.recv()
+    except EOFError:
+        # Died without reporting back: the OOM killer sends SIGKILL, anything else is a crash
+        process.join()
+        if process.exitcode == -signal.SIGKILL:
+            return "OOM", None, "killed by the OS"
+        return "ERROR", None, f"child exited with code {process.exitcode}"
+    finally:
+        receiver.close()
+
+    process.join()
+    print(output, end="")  # Anything the implementation printed
+    if status == "OOM":
+        detail = f"over {memory_limit / 2 ** 20:g} MiB" if memory_limit is not None else "out of memory"
+    return status, result, detail
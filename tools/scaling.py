@@ -0,0 +1,216 @@
+import argparse
+import contextlib
+import io
+import math
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from colorama import Fore, Style
+
+from tools.helpers import available_days, load_problem_class, setup_project_root
+from tools.memory import MemoryConfig
+from tools.parallel import PARALLEL_SUFFIX
+from tools.problem import Problem
+from tools.sandbox import run_sandboxed
+from tools.timing import TimingConfig
+
+COMPLEXITY_CLASSES: Dict[str, Callable[[float], float]] = {
+    "O(1)": lambda n: 1.0,
+    "O(log n)": lambda n: math.log(n),
+    "O(n)": lambda n: n,
+    "O(n log n)": lambda n: n * math.log(n),
+    "O(n²)": lambda n: n ** 2,
+    "O(n³)": lambda n: n ** 3,
+}
+
+# Few, short samples: large inputs are slow and the fit only needs the order of magnitude
+SCALING_TIMING = TimingConfig(repeat=3, warmup=0, min_sample_time=0.0, bootstrap_resamples=0)
+
+
+@dataclass
+class ScalingPoint:
+    size: int
+    time: float  # ms per call
+    parse_time: Optional[float]
+    peak_memory: int
+
+
+@dataclass
+class ScalingResult:
+    part: int
+    name: str
+    points: List[ScalingPoint] = field(default_factory=list)
+    skipped: List[int] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def time_exponent(self) -> Optional[float]:
+        return log_log_slope([(p.size, p.time) for p in self.points])
+
+    @property
+    def time_complexity(self) -> Optional[str]:
+        return fit_complexity([(p.size, p.time) for p in self.points])
+
+    @property
+    def memory_complexity(self) -> Optional[str]:
+        return fit_complexity([(p.size, float(p.peak_memory)) for p in self.points])
+
+
+def log_log_slope(points: Sequence[Tuple[int, float]]) -> Optional[float]:
+    """Least-squares slope of log(cost) against log(size), i.e. the k in cost ~ n^k."""
+    usable = [(math.log(n), math.log(cost)) for n, cost in points if n > 0 and cost > 0]
+    if len(usable) < 2:
+        return None
+    mean_x = sum(x for x, _ in usable) / len(usable)
+    mean_y = sum(y for _, y in usable) / len(usable)
+    denominator = sum((x - mean_x) ** 2 for x, _ in usable)
+    if denominator == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in usable) / denominator
+
+
+def fit_complexity(points: Sequence[Tuple[int, float]]) -> Optional[str]:
+    """Pick the complexity class whose curve c·f(n) fits the measurements best in log space."""
+    usable = [(n, cost) for n, cost in points if n > 1 and cost > 0]
+    if len(usable) < 2:
+        return None
+
+    best_name, best_error = None, math.inf
+    for name, model in COMPLEXITY_CLASSES.items():
+        residuals = [math.log(cost) - math.log(model(n)) for n, cost in usable]
+        log_c = sum(residuals) / len(residuals)
+        error = sum((r - log_c) ** 2 for r in residuals)
+        if error < best_error:
+            best_name, best_error = name, error
+    return best_name
+
+
+def parallel_speedup(serial: ScalingResult, parallel: ScalingResult) -> Tuple[List[Tuple[int, float]], Optional[int]]:
+    """Serial over parallel time at each size both reached, and the size from which parallel stays faster."""
+    serial_times = {point.size: point.time for point in serial.points}
+    speedups = [(point.size, serial_times[point.size] / point.time) for point in parallel.points
+                if point.size in serial_times and point.time > 0]
+    crossover = None
+    for size, speedup in speedups:
+        if speedup <= 1:
+            crossover = None
+        elif crossover is None:
+            crossover = size
+    return speedups, crossover
+
+
+def run_scaling(problem: Problem, scales: Sequence[int], seed: int = 0, budget: float = 5.0,
+                only_part: Optional[int] = None, implementation_name: Optional[str] = None,
+                timeout: Optional[float] = None, memory_limit: Optional[int] = None) -> List[ScalingResult]:
+    """Run every registered implementation on generated inputs ``scale`` times the size of the real input.
+
+    An implementation stops growing once the next scale would, even at linear growth, take longer than ``budget``
+    seconds per call. With a ``timeout`` or ``memory_limit`` each measurement runs in the sandbox, and an
+    implementation that hits either limit stops growing too.
+    """
+    problem.timing_config = SCALING_TIMING
+    problem.memory_config = MemoryConfig(mode="peak")
+    sandboxed = timeout is not None or memory_limit is not None
+    base_size = max(problem.input_size(), 1)
+    results: Dict[Tuple[int, str], ScalingResult] = {}
+    last_time: Dict[Tuple[int, str], Tuple[int, float]] = {}
+
+    for scale in sorted(scales):
+        size = base_size * scale
+        problem.set_data(problem.generate_input(size, seed))
+        size = problem.input_size()
+
+        for part, implementations in problem.implementations.items():
+            if only_part is not None and part != only_part:
+                continue
+            for name, impl in implementations.items():
+                if not impl.enabled or (implementation_name is not None and name != implementation_name):
+                    continue
+                key = (part, name)
+                result = results.setdefault(key, ScalingResult(part, name))
+                if result.error is not None:
+                    continue
+                if key in last_time:
+                    previous_size, previous_time = last_time[key]
+                    if previous_time / 1e3 * size / previous_size > budget:
+                        result.skipped.append(size)
+                        continue
+                try:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        if sandboxed:
+                            status, run, detail = run_sandboxed(problem, part, name, impl, None, timeout,
+                                                                memory_limit)
+                        else:
+                            status, run, detail = "OK", problem._measure_implementation(part, name, impl), ""
+                except Exception as e:
+                    status, detail = "ERROR", f"{type(e).__name__}: {e}"
+                if status != "OK":
+                    result.error = f"{status} at n={size}: {detail}"
+                    continue
+                parse_time = run.parse_stats.mean if run.parse_stats else None
+                result.points.append(ScalingPoint(size, run.timing_stats.mean, parse_time,
+                                                  run.memory_stats.peak_memory))
+                last_time[key] = (size, run.timing_stats.mean)
+
+    return list(results.values())
+
+
+def print_scaling(problem: Problem, results: List[ScalingResult]) -> None:
+    print(f"\n{Fore.CYAN}Scaling for Day {problem.day}: <<{problem.name}>>{Style.RESET_ALL}\n")
+    by_name = {(result.part, result.name): result for result in results}
+    for result in results:
+        print(f"Part {result.part} - {result.name}:")
+        for point in result.points:
+            parse = f" (parse {problem._format_time(point.parse_time)})" if point.parse_time is not None else ""
+            print(f"  n={point.size:<12} {problem._format_time(point.time):>12}{parse}  "
+                  f"peak: {problem._format_memory(point.peak_memory)}")
+        for size in result.skipped:
+            print(f"{Fore.YELLOW}  n={size:<12} skipped, over the time budget{Style.RESET_ALL}")
+        if result.error:
+            print(f"{Fore.RED}  ✗ {result.error}{Style.RESET_ALL}")
+
+        exponent = result.time_exponent
+        if exponent is not None:
+            print(f"{Fore.MAGENTA}  time: {result.time_complexity} (n^{exponent:.2f})  "
+                  f"memory: {result.memory_complexity}{Style.RESET_ALL}")
+        serial = by_name.get((result.part, result.name.removesuffix(PARALLEL_SUFFIX)))
+        if result.name.endswith(PARALLEL_SUFFIX) and serial is not None:
+            speedups, crossover = parallel_speedup(serial, result)
+            if speedups:
+                found = f"faster from n={crossover}" if crossover is not None else "never faster"
+                print(f"{Fore.MAGENTA}  speedup vs {serial.name}: "
+                      f"{', '.join(f'{speedup:.2f}x' for _, speedup in speedups)} ({found}){Style.RESET_ALL}")
+        print()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Estimate how each implementation scales with input size")
+    parser.add_argument("year", type=int, nargs="?", default=2024)
+    parser.add_argument("--day", type=int, action="append", help="Day to run (repeatable, default: all)")
+    parser.add_argument("--part", type=int, choices=(1, 2))
+    parser.add_argument("--implementation")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100, 1000],
+                        help="Input sizes as multiples of the real input")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget", type=float, default=5.0, help="Seconds a single call may take")
+    parser.add_argument("--timeout", type=float, help="Stop an implementation after this many seconds per size")
+    parser.add_argument("--memory-limit", type=float, metavar="MIB",
+                        help="Stop an implementation that allocates more than this many MiB")
+    args = parser.parse_args(argv)
+    memory_limit = int(args.memory_limit * 2 ** 20) if args.memory_limit is not None else None
+
+    setup_project_root()
+    for day in args.day or available_days(args.year):
+        with contextlib.redirect_stdout(io.StringIO()):
+            problem: Problem = load_problem_class(args.year, day)(load_example=False)
+        try:
+            results = run_scaling(problem, args.scales, args.seed, args.budget, args.part, args.implementation,
+                                  args.timeout, memory_limit)
+        except NotImplementedError as e:
+            print(f"{Fore.YELLOW}{e}{Style.RESET_ALL}")
+            continue
+        print_scaling(problem, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import contextlib
+import io
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+from colorama import Fore, Style
+
+from tools.helpers import available_days, load_problem_class, setup_project_root
+from tools.problem import Problem, StreamEngine
+from tools.timing import percentile
+
+
+@dataclass
+class ThroughputResult:
+    lines: int
+    seconds: List[float] = field(default_factory=list)  # one entry per repeat, each on a fresh engine
+    totals: Dict[int, int] = field(default_factory=dict)
+
+    @property
+    def best_rate(self) -> float:
+        return self.lines / min(self.seconds)
+
+    @property
+    def median_rate(self) -> float:
+        return self.lines / percentile(sorted(self.seconds), 50)
+
+
+def measure_throughput(make_engine: Callable[[], StreamEngine], lines: Sequence[str],
+                       repeat: int = 3) -> ThroughputResult:
+    """Feed ``lines`` into a fresh engine ``repeat`` times and time each full pass."""
+    lines = [line for line in lines if line]
+    result = ThroughputResult(len(lines))
+    for _ in range(max(repeat, 1)):
+        engine = make_engine()
+        start = time.perf_counter()
+        for line in lines:
+            engine.feed(line)
+        result.seconds.append(time.perf_counter() - start)
+        result.totals = engine.totals()
+    return result
+
+
+def print_throughput(problem: Problem, result: ThroughputResult) -> None:
+    print(f"\n{Fore.CYAN}Throughput for Day {problem.day}: <<{problem.name}>>{Style.RESET_ALL}\n")
+    print(f"{result.lines} lines × {len(result.seconds)} runs: "
+          f"best {result.best_rate:,.0f} lines/s, median {result.median_rate:,.0f} lines/s")
+    totals = ", ".join(f"part {part}: {total}" for part, total in sorted(result.totals.items()))
+    print(f"{Fore.MAGENTA}  final totals: {totals}{Style.RESET_ALL}\n")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Measure how many input lines per second a streaming engine takes")
+    parser.add_argument("year", type=int, nargs="?", default=2024)
+    parser.add_argument("--day", type=int, action="append", help="Day to run (repeatable, default: all)")
+    parser.add_argument("--size", type=int, default=100_000, help="Size passed to the day's input generator")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--shuffle", action="store_true",
+                        help="Feed the lines in random order, so e.g. rules arrive after the updates they affect")
+    args = parser.parse_args(argv)
+
+    setup_project_root()
+    for day in args.day or available_days(args.year):
+        with contextlib.redirect_stdout(io.StringIO()):
+            problem: Problem = load_problem_class(args.year, day)(load_example=False)
+        try:
+            problem.stream_engine()
+            lines = problem.generate_input(args.size, args.seed)
+        except NotImplementedError as e:
+            print(f"{Fore.YELLOW}{e}{Style.RESET_ALL}")
+            continue
+        if args.shuffle:
+            random.Random(args.seed).shuffle(lines)
+        print_throughput(problem, measure_throughput(problem.stream_engine, lines, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
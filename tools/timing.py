@@ -0,0 +1,138 @@
+import gc
+import math
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Callable, Sequence, Tuple
+
+
+@dataclass
+class TimingConfig:
+    repeat: int = 5
+    warmup: int = 1
+    min_sample_time: float = 0.02  # seconds, each sample loops the function until it takes at least this long
+    disable_gc: bool = True
+    bootstrap_resamples: int = 1000
+    confidence: float = 0.95
+    seed: int = 0
+
+
+@dataclass
+class TimingStats:
+    mean: float
+    std_dev: float
+    min_time: float
+    max_time: float
+    runs: int
+    loops: int = 1
+    p50: float = 0.0
+    p95: float = 0.0
+    p99: float = 0.0
+    ci_low: float = 0.0
+    ci_high: float = 0.0
+    samples: array = field(default_factory=lambda: array('d'), repr=False)
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Linearly interpolated percentile of already sorted values."""
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * pct / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def bootstrap_ci(values: Sequence[float], resamples: int, confidence: float, seed: int = 0) -> Tuple[float, float]:
+    """Percentile bootstrap confidence interval for the mean."""
+    if len(values) < 2 or resamples <= 0:
+        value = values[0] if values else 0.0
+        return value, value
+
+    import random  # Deferred: only needed once results are summarized
+
+    rng = random.Random(seed)
+    n = len(values)
+    means = sorted(sum(rng.choices(values, k=n)) / n for _ in range(resamples))
+    tail = (1 - confidence) / 2 * 100
+    return percentile(means, tail), percentile(means, 100 - tail)
+
+
+def _mean_stdev(values: Sequence[float]) -> Tuple[float, float]:
+    """Mean and sample standard deviation, without importing ``statistics`` (slow to import)."""
+    average = math.fsum(values) / len(values)
+    if len(values) < 2:
+        return average, 0.0
+    return average, math.sqrt(math.fsum((v - average) ** 2 for v in values) / (len(values) - 1))
+
+
+def _time_loops(func: Callable[[], object], loops: int, disable_gc: bool) -> float:
+    """Run ``func`` ``loops`` times and return the total elapsed time in seconds."""
+    gc_was_enabled = gc.isenabled()
+    if disable_gc:
+        gc.disable()
+    try:
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter_ns() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return elapsed / 1e9
+
+
+def autorange(func: Callable[[], object], min_time: float, disable_gc: bool = True) -> Tuple[int, float]:
+    """Find a loop count so one sample takes at least ``min_time`` seconds, like ``timeit.Timer.autorange``.
+
+    Returns the loop count and the time taken by the last calibration round.
+    """
+    loops = 1
+    while True:
+        for multiplier in (1, 2, 5):
+            number = loops * multiplier
+            elapsed = _time_loops(func, number, disable_gc)
+            if elapsed >= min_time:
+                return number, elapsed
+        loops *= 10
+
+
+def summarize(samples: array, loops: int, config: TimingConfig) -> TimingStats:
+    ordered = sorted(samples)
+    ci_low, ci_high = bootstrap_ci(ordered, config.bootstrap_resamples, config.confidence, config.seed)
+    average, std_dev = _mean_stdev(ordered)
+    return TimingStats(
+        mean=average,
+        std_dev=std_dev,
+        min_time=ordered[0],
+        max_time=ordered[-1],
+        runs=len(ordered),
+        loops=loops,
+        p50=percentile(ordered, 50),
+        p95=percentile(ordered, 95),
+        p99=percentile(ordered, 99),
+        ci_low=ci_low,
+        ci_high=ci_high,
+        samples=samples,
+    )
+
+
+def measure(func: Callable[[], object], config: TimingConfig) -> TimingStats:
+    """Benchmark ``func`` and return per-call statistics in milliseconds.
+
+    Runs ``config.warmup`` untimed calls, calibrates a loop count so that each sample is long enough to be
+    above the timer noise, then collects ``config.repeat`` samples.
+    """
+    for _ in range(config.warmup):
+        func()
+
+    loops, calibration = autorange(func, config.min_sample_time, config.disable_gc)
+    samples = array('d')
+    if loops == 1:
+        # Slow functions: the calibration call is already a valid sample
+        samples.append(calibration * 1e3)
+
+    while len(samples) < max(config.repeat, 1):
+        samples.append(_time_loops(func, loops, config.disable_gc) / loops * 1e3)
+
+    return summarize(samples, loops, config)
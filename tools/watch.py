@@ -0,0 +1,171 @@
+import ast
+import hashlib
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from colorama import Fore, Style
+
+from tools.helpers import CheckTask, RunOptions, TaskOutcome, _run_parallel, available_days, setup_project_root
+from tools.problem import RunResult
+from tools.registry import DayInfo, discover
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# (day, part, implementation); part and name are None for days whose implementations are only known once imported
+Key = Tuple[int, Optional[int], Optional[str]]
+
+
+@dataclass
+class CachedRun:
+    fingerprint: str
+    results: Dict[int, List[RunResult]]  # one result for an implementation, all of them for a whole day
+
+
+def _digest(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def _file_digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest() if path.exists() else "missing"
+
+
+def _tools_digest() -> str:
+    return _digest(*(_file_digest(path) for path in sorted((PROJECT_ROOT / "tools").glob("*.py"))))
+
+
+def implementation_fingerprints(info: DayInfo, shared: str) -> Dict[Key, str]:
+    """A hash per implementation of its own method, everything else in the module it may use, and ``shared``.
+
+    Sources are compared as ASTs, so comment and formatting edits do not count as changes. An edit to one
+    implementation method only changes that implementation's hash; edits anywhere else in the module (helpers,
+    parsers, registrations) change them all.
+    """
+    tree = ast.parse(info.path.read_text(), filename=str(info.path))
+    methods: Dict[str, str] = {}
+    common: List[str] = []
+    implemented = {impl.method for impl in info.implementations if impl.method}
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == info.class_name:
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and item.name in implemented:
+                    methods[item.name] = ast.dump(item)
+                else:
+                    common.append(ast.dump(item))
+        else:
+            common.append(ast.dump(node))
+
+    base = _digest(shared, *common)
+    if not info.implementations:
+        return {(info.day, None, None): base}
+    return {(info.day, impl.part, impl.name): _digest(base, methods.get(impl.method or "", impl.name))
+            for impl in info.implementations}
+
+
+def fingerprints(year: int, days: List[int]) -> Dict[Key, str]:
+    registry = discover(year)
+    tools = _tools_digest()
+    solutions = _file_digest(PROJECT_ROOT / str(year) / "solutions.csv")
+    found: Dict[Key, str] = {}
+    for day in days:
+        if day in registry:
+            data = _file_digest(PROJECT_ROOT / str(year) / "data" / f"day{day}")
+            found.update(implementation_fingerprints(registry[day], _digest(tools, solutions, data)))
+    return found
+
+
+def snapshot(year: int) -> Dict[Path, int]:
+    """Modification times of everything a run depends on, polled to notice edits."""
+    root = PROJECT_ROOT / str(year)
+    paths = [*(root / "solutions").glob("*.py"), *(root / "data").glob("day*"), root / "solutions.csv",
+             *(PROJECT_ROOT / "tools").glob("*.py")]
+    stamps = {}
+    for path in paths:
+        try:
+            stamps[path] = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            continue
+    return stamps
+
+
+class Watcher:
+    """Keeps the last ``RunResult`` of every implementation and re-runs only those whose fingerprint changed."""
+
+    def __init__(self, year: int, days: Optional[List[int]], options: RunOptions, part: Optional[int] = None,
+                 implementation: Optional[str] = None, workers: Optional[int] = None) -> None:
+        self.year = year
+        self.days = days
+        self.options = options
+        self.part = part
+        self.implementation = implementation
+        self.workers = workers
+        self.cache: Dict[Key, CachedRun] = {}
+
+    def _selected(self, key: Key) -> bool:
+        _, part, name = key
+        return ((self.part is None or part is None or part == self.part)
+                and (self.implementation is None or name is None or name == self.implementation))
+
+    def sweep(self) -> List[Key]:
+        """Re-run what changed since the last sweep, print a summary of everything, and return the re-run keys."""
+        days = [day for day in available_days(self.year) if self.days is None or day in self.days]
+        current = {key: fingerprint for key, fingerprint in fingerprints(self.year, days).items()
+                   if self._selected(key)}
+        changed = [key for key, fingerprint in current.items()
+                   if key not in self.cache or self.cache[key].fingerprint != fingerprint]
+        for key in set(self.cache) - set(current):
+            del self.cache[key]  # Implementation removed or renamed
+
+        tasks = [CheckTask(self.year, day, self.part if part is None else part,
+                           self.implementation if name is None else name, self.options)
+                 for day, part, name in changed]
+        keys = {id(task): key for task, key in zip(tasks, changed)}
+
+        def on_outcome(task: CheckTask, outcome: TaskOutcome) -> None:
+            key = keys[id(task)]
+            results = outcome[2]
+            if any(results.values()):  # A failed run is not cached, so the next sweep tries it again
+                self.cache[key] = CachedRun(current[key], results)
+
+        if tasks:
+            _run_parallel(tasks, self.workers, on_outcome)
+        self._print_summary(current, set(changed))
+        return changed
+
+    def _print_summary(self, current: Dict[Key, str], changed: set) -> None:
+        reused = len(current) - len(changed)
+        print(f"\n{Fore.CYAN}Watch: {len(changed)} re-run, {reused} reused at {time.strftime('%H:%M:%S')}"
+              f"{Style.RESET_ALL}")
+        for key in current:
+            if key not in self.cache:
+                continue
+            fresh = f"{Fore.YELLOW}new{Style.RESET_ALL}" if key in changed else "cached"
+            for part, runs in sorted(self.cache[key].results.items()):
+                for run in runs:
+                    status = f"{Fore.GREEN}✓ {run.status}" if run.passed else f"{Fore.RED}✗ {run.status}"
+                    timing = f"avg: {run.timing_stats.mean:.4f}ms" if run.measured else run.detail
+                    print(f"  Day {key[0]} part {part} - {run.name}: {status}{Style.RESET_ALL} {run.result} "
+                          f"{timing} {fresh}")
+
+    def run(self, interval: float = 1.0, sweeps: Optional[int] = None) -> None:
+        """Sweep now and again after every change, polling file modification times every ``interval`` seconds."""
+        setup_project_root()
+        print(f"Watching {self.year}/solutions, {self.year}/data and tools (Ctrl+C to stop)")
+        last = snapshot(self.year)
+        self.sweep()
+        done = 1
+        try:
+            while sweeps is None or done < sweeps:
+                time.sleep(interval)
+                current = snapshot(self.year)
+                if current != last:
+                    last = current
+                    self.sweep()
+                    done += 1
+        except KeyboardInterrupt:
+            print("\nStopped watching")